@@ -1,5 +1,23 @@
 from .api import LeagueApi
-from .static import Region, Queue
+from .static import Region, Queue, Tier, Division
 from .utility import print_tab
 from .exception import ApiException
-from .database import Database
\ No newline at end of file
+from .database import Database
+from .transport import Transport
+from .ratelimit import RateLimiter
+from .async_api import AsyncLeagueApi
+from .ingest import IngestPipeline, IngestReport
+from .columnar import TimelineColumns
+from .cache import ResponseCache, SqliteResponseCache
+from .cache import MethodCache, CacheStats
+from .keys import ApiKeyPool
+from .ladder import LadderCrawler
+from .sync import MatchHistorySync
+from .parser import ParserPool
+from .archive import ResponseArchive
+from .record import Record, record_type, to_mapped
+from .metrics import Instrumentation, Metrics, StatsdInstrumentation
+from .resolver import SummonerResolver
+from .partition import TimelineStore
+from .export import ArrowExporter
+from .database import UnitOfWork
\ No newline at end of file
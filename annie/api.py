@@ -1,4 +1,4 @@
-from .static import Region, Queue, SummonerV4, LeagueV4, MatchV5
+from .static import Region, Queue, Tier, Division, SummonerV4, LeagueV4, MatchV5, endpoint_of
 from .dto import(
     MatchBansDto,
     MatchObjectivesDto,
@@ -16,100 +16,265 @@ from .dto import(
     MatchEventDto,
 )
 from .exception import ApiException
-
-from cachetools import cached, TTLCache
-from typing import Dict, List, Union
-from re import sub
-from datetime import datetime
-import requests
-from time import sleep
+from .transport import Transport
+from .ratelimit import RateLimiter
+from .cache import ResponseCache, MethodCache, cached_method
+from .metrics import Instrumentation, instrumentation_of
+from .keys import ApiKeyPool, fingerprint
+from .archive import ResponseArchive
+from .database import Database
+from .record import dto_type
+from .columnar import TimelineColumns, build_timeline_columns
+from .lazy import DeferredTimeline, defer_timeline
+from .stream import iter_array_items
+from .utility import snake_case, game_id_of, SNAKE_CASE_KEYS
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from requests import Response
+from datetime import date, datetime
+from functools import partial
+from time import perf_counter
+import json
+
+
+METHOD_CACHES: Dict[str, Optional[Tuple[int, float]]] = {
+    'get_summoner': (1024, 60*60),
+    'get_league_entries': (1024, 60),
+    'get_challenger_league': (16, 60*5),
+    'get_grandmaster_league': (16, 60*5),
+    'get_master_league': (16, 60*5),
+}
 
 
 class BaseApi:
-    def __init__(self, api_key: str, debug: bool=False):
+    def __init__(self, api_key: str | List[str], debug: bool=False, transport: Transport=None,
+                 rate_limiter: RateLimiter=None, retries: int=3, cache: ResponseCache=None,
+                 archive: ResponseArchive=None, instrumentation: Instrumentation | List[Instrumentation]=None):
         self._debug = debug
-        self._api_key = api_key
+        self._instrumentation = instrumentation_of(instrumentation)
+        self._transport = transport if transport is not None else Transport()
+        self._rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self._retries = retries
+        self._cache = cache
+        self._archive = archive
+        self.set_api_key(api_key)
 
     @staticmethod
     def transform_to_snake_case(data: Union[Dict, List]) -> Dict:
-        translate = None
-        if isinstance(data, list):
-            translate = [BaseApi.transform_to_snake_case(n) if isinstance(n, (list, dict)) else n for n in data]
-        elif isinstance(data, dict):
+        if isinstance(data, dict):
             translate = {}
-            for k, v in data.items():
-                new_key = sub(r'(?<!^)(?=[A-Z])', '_', k).lower()
-                if isinstance(v, (dict, list)):
-                    new_value = BaseApi.transform_to_snake_case(v)
-                    translate[new_key] = new_value
-                else:
-                    translate[new_key] = v
+        elif isinstance(data, list):
+            translate = []
+        else:
+            return None
+
+        keys = SNAKE_CASE_KEYS
+        stack = [(data, translate)]
+        while stack:
+            source, target = stack.pop()
+            if isinstance(source, dict):
+                for k, v in source.items():
+                    new_key = keys.get(k) or snake_case(k)
+                    if isinstance(v, dict):
+                        target[new_key] = {}
+                        stack.append((v, target[new_key]))
+                    elif isinstance(v, list):
+                        target[new_key] = []
+                        stack.append((v, target[new_key]))
+                    else:
+                        target[new_key] = v
+            else:
+                for v in source:
+                    if isinstance(v, dict):
+                        target.append({})
+                        stack.append((v, target[-1]))
+                    elif isinstance(v, list):
+                        target.append([])
+                        stack.append((v, target[-1]))
+                    else:
+                        target.append(v)
         return translate
 
-    def query(self, region: Region, method_name: str, **kwargs) -> Dict:
+    def query(self, region: Region, method_name: str, pin: str=None, **kwargs) -> Dict:
         parameters = '&'.join([f'{n}={m}' for n, m in kwargs.items() if m is not None])
-        uri = f'https://{region.value}{method_name}?{parameters}'
+        endpoint = endpoint_of(method_name)
+        cacheable = self._cache is not None and self._cache.cacheable(endpoint)
+        if cacheable:
+            key = f'{region.name}:{method_name}?{parameters}'
+            entry = self._cache.entry(key)
+            hit = entry is not None and self._pin_cached(pin, entry[1])
+            self._instrumentation.on_cache(endpoint, hit)
+            if hit:
+                return self.transform_to_snake_case(json.loads(entry[0]))
+
+        r, api_key = self._request(region, endpoint, f'https://{region.value}{method_name}?{parameters}', pin=pin)
+        started = perf_counter()
+        data = r.json()
+
+        if cacheable:
+            self._cache.set(key, endpoint, r.content, fingerprint(api_key))
+        if self._archive is not None:
+            self._archive.write(region, endpoint, method_name, parameters, r.content)
+
+        data = self.transform_to_snake_case(data)
+        self._instrumentation.on_parse(endpoint, perf_counter() - started)
+        return data
 
+    def stream(self, region: Region, method_name: str, chunk_size: int=64*1024, pin: str=None, **kwargs) -> Iterator[bytes]:
+        parameters = '&'.join([f'{n}={m}' for n, m in kwargs.items() if m is not None])
+        endpoint = endpoint_of(method_name)
+        cacheable = self._cache is not None and self._cache.cacheable(endpoint)
+        if cacheable:
+            key = f'{region.name}:{method_name}?{parameters}'
+            entry = self._cache.entry(key)
+            hit = entry is not None and self._pin_cached(pin, entry[1])
+            self._instrumentation.on_cache(endpoint, hit)
+            if hit:
+                body = entry[0]
+                for n in range(0, len(body), chunk_size):
+                    yield body[n:n+chunk_size]
+                return
+
+        r, api_key = self._request(region, endpoint, f'https://{region.value}{method_name}?{parameters}', stream=True, pin=pin)
+        writer = self._cache.writer(key, endpoint, fingerprint(api_key)) if cacheable else None
+        archived = None
+        if self._archive is not None and self._archive.archives(endpoint):
+            archived = self._archive.writer(region, endpoint, method_name, parameters)
+        size = 0
+        try:
+            for chunk in r.iter_content(chunk_size):
+                size += len(chunk)
+                if writer is not None:
+                    writer.write(chunk)
+                if archived is not None:
+                    archived.write(chunk)
+                yield chunk
+            if writer is not None:
+                writer.commit()
+            if archived is not None:
+                archived.commit()
+        finally:
+            self._instrumentation.on_bytes(region, endpoint, size)
+            r.close()
+
+    def _pin_cached(self, pin: Optional[str], fingerprint: Optional[str]) -> bool:
+        # ids in a cached body are encrypted for the key that fetched it: a pinned lookup only uses the body while
+        # that key is in the pool and pins to it like the original request did, otherwise it is fetched again
+        if pin is None:
+            return True
+        api_key = self._keys.key_of(fingerprint)
+        if api_key is None:
+            return False
+        self._keys.pin(api_key, pin)
+        return True
+
+    def _request(self, region: Region, endpoint: str, uri: str, stream: bool=False, pin: str=None) -> Tuple[Response, str]:
         if self._debug:
             print(uri)
 
-        header = {
-            'Origin': 'https://developer.riotgames.com',
-            'X-Riot-Token': self._api_key
-        }
-        r = requests.get(uri, headers=header)
-        data = r.json()
-
-        if r.status_code == 429:
-            print('rate limit exceeded -> sleep 2min')
-            sleep(120)
+        # a pin first assigned by this request may still move to another key if that one is rejected
+        movable = pin is None or self._keys.pinned(pin) is None
+        for attempt in range(self._retries + 1):
+            api_key = self._keys.select(region, endpoint, pin)
+            waited = self._rate_limiter.acquire(region, endpoint, api_key)
+            self._instrumentation.on_rate_limit_wait(region, endpoint, waited)
+
+            started = perf_counter()
+            r = self._transport.get(region, uri, headers={'X-Riot-Token': api_key}, stream=stream)
+            self._instrumentation.on_request(region, endpoint, r.status_code, perf_counter() - started)
+            if not stream:
+                self._instrumentation.on_bytes(region, endpoint, len(r.content))
+            retry_after = self._rate_limiter.update(region, endpoint, r.headers, r.status_code, api_key)
+            self._keys.report(api_key, r.status_code, retry_after)
+
+            rejected = r.status_code in (401, 403) and movable and self._keys.active()
+            if r.status_code != 429 and not rejected or attempt == self._retries:
+                break
+            if rejected and pin is not None:
+                self._keys.unpin(pin)
+            if r.status_code == 429 and self._debug:
+                print(f'rate limit exceeded -> retry in {retry_after}s')
+            r.close()
 
-            r = requests.get(uri, headers=header)
+        if r.status_code != 200:
             data = r.json()
-            if r.status_code != 200:
-                raise ApiException(message=data['status']['message'], status_code=r.status_code)
-        elif r.status_code != 200:
             raise ApiException(message=data['status']['message'], status_code=r.status_code)
+        return r, api_key
 
-        data = self.transform_to_snake_case(data)
-        return data
+    def set_api_key(self, api_key: str | List[str]):
+        self._keys = ApiKeyPool([api_key] if isinstance(api_key, str) else api_key, self._rate_limiter)
+
+    def close(self):
+        # the response cache is passed in and may be shared between apis, closing it is left to its owner
+        self._transport.close()
 
-    def set_api_key(self, api_key: List[str]):
-        self._api_key = api_key
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
 
 class LeagueApi(BaseApi):
-    def __init__(self, api_key: str):
-        super().__init__(api_key)
+    def __init__(self, api_key: str | List[str], transport: Transport=None, rate_limiter: RateLimiter=None,
+                 cache: ResponseCache=None, method_caches: Dict[str, Optional[Tuple[int, float]]]=None,
+                 archive: ResponseArchive=None, records: bool=False, debug: bool=False,
+                 instrumentation: Instrumentation | List[Instrumentation]=None, prefetch_workers: int=4,
+                 retries: int=3):
+        super().__init__(api_key, debug=debug, transport=transport, rate_limiter=rate_limiter, retries=retries,
+                         cache=cache, archive=archive, instrumentation=instrumentation)
+        self._records = records
+        method_caches = {**METHOD_CACHES, **(method_caches or {})}
+        self._method_caches = {
+            k: MethodCache(*v, listener=partial(self._instrumentation.on_cache, k))
+            for k, v in method_caches.items() if v is not None
+        }
+        self._prefetcher: Optional[ThreadPoolExecutor] = None
+        self._prefetch_workers = prefetch_workers
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        return {k: v.stats.to_dict() for k, v in self._method_caches.items()}
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60*60))
+    def close(self):
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown(wait=True)
+            self._prefetcher = None
+        super().close()
+
+    @cached_method
     def get_summoner(self, region: Region, name: str=None, account_id: str=None,
                      summoner_id: str = None, puuid: str = None) -> SummonerDto:
 
         if summoner_id:
-            result = self.query(region, SummonerV4.by_id(summoner_id))
+            pin = summoner_id
+            result = self.query(region, SummonerV4.by_id(summoner_id), pin=pin)
 
         elif account_id:
-            result = self.query(region, SummonerV4.by_account_id(account_id))
+            pin = account_id
+            result = self.query(region, SummonerV4.by_account_id(account_id), pin=pin)
 
         elif puuid:
-            result = self.query(region, SummonerV4.by_puuid(puuid))
+            pin = puuid
+            result = self.query(region, SummonerV4.by_puuid(puuid), pin=pin)
 
         elif name:
-            result = self.query(region, SummonerV4.by_name(name))
+            pin = f'{region.name}:{name}'
+            result = self.query(region, SummonerV4.by_name(name), pin=pin)
 
         else:
             raise ValueError('[summoner_id|account_id|puuid|name] is missing')
 
+        self._pin_ids(pin, result['id'], result['account_id'], result['puuid'])
         result['summoner_id'] = result.pop('id')
         result['summoner_name'] = result.pop('name')
         result['revision_date'] = datetime.fromtimestamp(result['revision_date']/1000.0)
 
-        return SummonerDto(region=region.name, **result)
+        return dto_type(SummonerDto, self._records)(region=region.name, **result)
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60))
+    @cached_method
     def get_league_entries(self, region: Region, summoner_id: str) -> List[LeagueEntryDto]:
-        result = self.query(region, LeagueV4.entries_by_summoner_id(summoner_id))
+        result = self.query(region, LeagueV4.entries_by_summoner_id(summoner_id), pin=summoner_id)
 
         entries = []
         for entry in result:
@@ -122,32 +287,142 @@ class LeagueApi(BaseApi):
                     **entry.pop('mini_series')
                 )
 
-            entries.append(LeagueEntryDto(region=region.name, **entry))
+            entries.append(dto_type(LeagueEntryDto, self._records)(region=region.name, **entry))
+
+        return entries
+
+    def get_league_entries_page(self, region: Region, queue: Queue, tier: Tier, division: Division,
+                                page: int=1) -> List[LeagueEntryDto]:
+        result = self.query(region, LeagueV4.entries(queue, tier, division), page=page)
+
+        entries = []
+        for entry in result:
+            entry.pop('mini_series', None) # not mapped on LeagueEntryDto yet
+            entries.append(dto_type(LeagueEntryDto, self._records)(region=region.name, **entry))
 
         return entries
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60*5))
+    @cached_method
     def get_challenger_league(self, region: Region, queue: Queue) -> LeagueListDto:
         result = self.query(region, LeagueV4.challenger_league_by_queue(queue))
-        return self._create_league_list_dto(result, region)
+        return self._create_league_list_dto(result, region, self._records)
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60*5))
+    @cached_method
     def get_grandmaster_league(self, region: Region, queue: Queue) -> LeagueListDto:
         result = self.query(region, LeagueV4.grandmaster_league_by_queue(queue))
-        return self._create_league_list_dto(result, region)
+        return self._create_league_list_dto(result, region, self._records)
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=60*5))
+    @cached_method
     def get_master_league(self, region: Region, queue: Queue) -> LeagueListDto:
         result = self.query(region, LeagueV4.master_league_by_queue(queue))
-        return self._create_league_list_dto(result, region)
+        return self._create_league_list_dto(result, region, self._records)
+
+    def get_apex_league_entries(self, region: Region, queue: Queue, tier: Tier) -> List[LeagueEntryDto]:
+        # the paged entries endpoint has no divisions above diamond, apex tiers come as one league list
+        match tier:
+            case Tier.CHALLENGER:
+                league = self.get_challenger_league(region, queue)
+            case Tier.GRANDMASTER:
+                league = self.get_grandmaster_league(region, queue)
+            case Tier.MASTER:
+                league = self.get_master_league(region, queue)
+            case _:
+                raise ValueError(f'{tier.name} is not an apex tier')
+
+        return [
+            dto_type(LeagueEntryDto, self._records)(
+                region=region.name, summoner_id=n.summoner_id, league_id=n.league_id, queue_type=league.queue,
+                summoner_name=n.summoner_name, tier=league.tier, rank=n.rank, league_points=n.league_points,
+                wins=n.wins, losses=n.losses, hot_streak=n.hot_streak, veteran=n.veteran,
+                fresh_blood=n.fresh_blood, inactive=n.inactive
+            ) for n in league.entries
+        ]
+
+    def get_match(self, region: Region, game_id: str, fetch_timeline: bool=False, lazy_timeline: bool=False,
+                  prefetch_timeline: bool=False, database: Database=None) -> MatchInfoDto:
+        region = self._match_region(region)
+        result = self.query_match(region, game_id)
+        timeline = self.get_timeline(region, game_id) if fetch_timeline else None
+        return self.build_match(region, game_id, result, timeline, lazy_timeline=lazy_timeline,
+                                prefetch_timeline=prefetch_timeline, database=database)
+
+    def query_match(self, region: Region, game_id: str) -> Dict:
+        # participant ids in a match body are encrypted for the key that fetched it, later lookups must use that key
+        region = self._match_region(region)
+        pin = f'match:{game_id}'
+        result = self.query(region, MatchV5.match(game_id), pin=pin)
+        participants = result['info']['participants']
+        self._pin_ids(pin, *(n.get('summoner_id') for n in participants), *(n.get('puuid') for n in participants))
+        return result
 
-    def get_match(self, region: Region, game_id: str, fetch_timeline: bool=False) -> MatchInfoDto:
-        if region == Region.EUW:
-            region = Region.EUROPE
+    def build_match(self, region: Region, game_id: str, result: Dict, timeline: Dict=None, lazy_timeline: bool=False,
+                    prefetch_timeline: bool=False, database: Database=None) -> MatchInfoDto:
+        match = self._build('match', self._create_match_dto, result, timeline, self._records)
+
+        if timeline is None and (lazy_timeline or prefetch_timeline):
+            if self._records:
+                raise ValueError('lazy timelines need mapped dtos, records are plain dataclasses')
+
+            # a stored timeline is looked up on first access, in the accessing thread
+            region = self._match_region(region)
+            stored = partial(database.timeline, match.game_id) if database is not None else None
+            handle = DeferredTimeline(partial(self.get_timeline, region, game_id), stored)
+            if prefetch_timeline:
+                handle.prefetch(self._prefetch_executor())
+            defer_timeline(match, handle)
+
+        return match
+
+    def _pin_ids(self, pin: str, *ids: str):
+        # the query pinned `pin` to the key of the body, unless the pool has evicted it since
+        api_key = self._keys.pinned(pin)
+        if api_key is not None:
+            self._keys.pin(api_key, *ids)
+
+    def _prefetch_executor(self) -> ThreadPoolExecutor:
+        if self._prefetcher is None:
+            self._prefetcher = ThreadPoolExecutor(max_workers=self._prefetch_workers)
+        return self._prefetcher
+
+    def get_timeline(self, region: Region, game_id: str, columnar: bool=False) -> Dict | TimelineColumns:
+        region = self._match_region(region)
+        return self.build_timeline(self.query(region, MatchV5.timeline(game_id)), columnar)
+
+    def build_timeline(self, result: Dict, columnar: bool=False) -> Dict | TimelineColumns:
+        if columnar:
+            return self._build('timeline_columns', build_timeline_columns, result)
+        return self._build('timeline', self._create_timeline_dtos, result, self._records)
+
+    def _build(self, kind: str, builder, *args):
+        started = perf_counter()
+        result = builder(*args)
+        self._instrumentation.on_build(kind, perf_counter() - started)
+        return result
+
+    def iter_timeline(self, region: Region, game_id: str) -> Iterator[Tuple[List[MatchParticipantFramesDto], List[MatchEventDto]]]:
+        region = self._match_region(region)
+        chunks = self.stream(region, MatchV5.timeline(game_id))
+        try:
+            for frame in iter_array_items(chunks, 'frames'):
+                yield self._create_frame_dtos(self.transform_to_snake_case(frame), game_id_of(game_id), self._records)
+            for _ in chunks:
+                pass
+        finally:
+            chunks.close()
 
-        result = self.query(region, MatchV5.match(game_id))
+    @staticmethod
+    def replay_matches(archive: ResponseArchive, start: date=None, end: date=None, records: bool=False) -> Iterator[MatchInfoDto]:
+        for response in archive.iter('MatchV5.match', start, end):
+            yield LeagueApi._create_match_dto(LeagueApi.transform_to_snake_case(response.body), records=records)
+
+    @staticmethod
+    def replay_timelines(archive: ResponseArchive, start: date=None, end: date=None, records: bool=False) -> Iterator[Dict]:
+        for response in archive.iter('MatchV5.timeline', start, end):
+            yield LeagueApi._create_timeline_dtos(LeagueApi.transform_to_snake_case(response.body), records)
 
-        info = result.pop('info')
+    @staticmethod
+    def _create_match_dto(data: Dict, timeline: Dict=None, records: bool=False) -> MatchInfoDto:
+        info = data.pop('info')
         info['game_creation'] = datetime.fromtimestamp(info['game_creation']/1000.0)
         info['game_start_timestamp'] = datetime.fromtimestamp(info['game_start_timestamp']/1000.0)
         if 'game_end_timestamp' in info:
@@ -165,7 +440,7 @@ class LeagueApi(BaseApi):
             stats['game_id'] = info['game_id']
             stats['team_id'] = participant['team_id']
             stats['participant_id'] = participant['participant_id']
-            dto_stats = MatchStatPerksDto(**stats)
+            dto_stats = dto_type(MatchStatPerksDto, records)(**stats)
 
             styles = perks.pop('styles')
             dto_styles = []
@@ -177,13 +452,13 @@ class LeagueApi(BaseApi):
                     selection['team_id'] = participant['team_id']
                     selection['description'] = style['description']
                     selection['style'] = style['style']
-                    dto_styles.append(MatchStylePerksDto(**selection))
+                    dto_styles.append(dto_type(MatchStylePerksDto, records)(**selection))
 
 
             participant['game_id'] = info['game_id']
             participant['stat_perks'] = [dto_stats]
             participant['style_perks'] = dto_styles
-            dto_participants.append(MatchParticipantDto(**participant))
+            dto_participants.append(dto_type(MatchParticipantDto, records)(**participant))
 
         dto_teams = []
         teams = info.pop('teams')
@@ -193,7 +468,7 @@ class LeagueApi(BaseApi):
             for ban in bans:
                 ban['game_id'] = info['game_id']
                 ban['team_id'] = team['team_id']
-                dto_bans.append(MatchBansDto(**ban))
+                dto_bans.append(dto_type(MatchBansDto, records)(**ban))
 
             dto_objectives = []
             objectives = team.pop('objectives')
@@ -202,67 +477,73 @@ class LeagueApi(BaseApi):
                 buffer['objective'] = objective
                 buffer['game_id'] = info['game_id']
                 buffer['team_id'] = team['team_id']
-                dto_objectives.append(MatchObjectivesDto(**buffer))
+                dto_objectives.append(dto_type(MatchObjectivesDto, records)(**buffer))
 
             team['game_id'] = info['game_id']
             team['bans'] = dto_bans
             team['objectives'] = dto_objectives
-            dto_teams.append(MatchTeamDto(**team))
+            dto_teams.append(dto_type(MatchTeamDto, records)(**team))
 
         info['participants'] = dto_participants
         info['teams'] = dto_teams
 
-        if fetch_timeline:
-            timeline = self.get_timeline(region, game_id)
+        if timeline is not None:
             info['timeline_participants'] = timeline['participants']
             info['timeline_events'] = timeline['events']
         else:
             info['timeline_participants'] = []
             info['timeline_events'] = []
 
-        return MatchInfoDto(**info)
-
-    def get_timeline(self, region: Region, game_id: str):
-        if region == Region.EUW:
-            region = Region.EUROPE
+        return dto_type(MatchInfoDto, records)(**info)
 
-        result = self.query(region, MatchV5.timeline(game_id))
-        info = result.pop('info')
+    @staticmethod
+    def _create_timeline_dtos(data: Dict, records: bool=False) -> Dict:
+        info = data.pop('info')
         frames = info.pop('frames')
         dto_participant_frames = []
         dto_event_frames = []
 
         for frame in frames:
-            participants = frame.pop('participant_frames')
-            for participant in participants.values():
-                champion_stats = participant.pop('champion_stats')
-                damage_stats = participant.pop('damage_stats')
-                position = participant.pop('position')
-                participant['game_id'] = info['game_id']
-                participant['timestamp'] = frame['timestamp']
-                dto_participant_frames.append(MatchParticipantFramesDto(
-                    **participant,
-                    **champion_stats,
-                    **damage_stats,
-                    **position
-                ))
-
-            events = frame.pop('events')
-            for sequence, event in enumerate(events):
-                event['game_id'] = info['game_id']
-                event['timeframe'] = frame['timestamp']
-                buffer = MatchEventDto.parse(
-                    sequence=sequence,
-                    **event
-                )
-                if buffer:
-                    dto_event_frames.append(buffer)
+            participant_frames, event_frames = LeagueApi._create_frame_dtos(frame, info['game_id'], records)
+            dto_participant_frames.extend(participant_frames)
+            dto_event_frames.extend(event_frames)
 
         return {'participants': dto_participant_frames, 'events': dto_event_frames}
 
+    @staticmethod
+    def _create_frame_dtos(frame: Dict, game_id: int, records: bool=False) -> Tuple[List[MatchParticipantFramesDto], List[MatchEventDto]]:
+        dto_participant_frames = []
+        dto_event_frames = []
+
+        participants = frame.pop('participant_frames')
+        for participant in participants.values():
+            champion_stats = participant.pop('champion_stats')
+            damage_stats = participant.pop('damage_stats')
+            position = participant.pop('position')
+            participant['game_id'] = game_id
+            participant['timestamp'] = frame['timestamp']
+            dto_participant_frames.append(dto_type(MatchParticipantFramesDto, records)(
+                **participant,
+                **champion_stats,
+                **damage_stats,
+                **position
+            ))
+
+        events = frame.pop('events')
+        for sequence, event in enumerate(events):
+            event['game_id'] = game_id
+            event['timeframe'] = frame['timestamp']
+            buffer = MatchEventDto.parse_fields(
+                sequence=sequence,
+                **event
+            )
+            if buffer:
+                dto_event_frames.append(dto_type(MatchEventDto, records)(**buffer))
+
+        return dto_participant_frames, dto_event_frames
+
     def get_match_history(self, region: Region, puuid : str, start: int=None, count: int=None, start_time: datetime=None, end_time: datetime=None, queue: Queue=None):
-        if region == Region.EUW:
-            region = Region.EUROPE
+        region = self._match_region(region)
 
         if start_time is not None:
             start_time = int(start_time.timestamp())
@@ -286,11 +567,17 @@ class LeagueApi(BaseApi):
                 match_type = 'normal'
                 queue = 430
 
-        result = self.query(region, MatchV5.match_history_by_puuid(puuid), count=count, start=start, startTime=start_time, endTime=end_time, type=match_type, queue=queue)
+        result = self.query(region, MatchV5.match_history_by_puuid(puuid), pin=puuid, count=count, start=start, startTime=start_time, endTime=end_time, type=match_type, queue=queue)
         return result
 
     @staticmethod
-    def _create_league_list_dto(data: Dict, region: Region) -> LeagueListDto:
+    def _match_region(region: Region) -> Region:
+        if region == Region.EUW:
+            return Region.EUROPE
+        return region
+
+    @staticmethod
+    def _create_league_list_dto(data: Dict, region: Region, records: bool=False) -> LeagueListDto:
         buffer = []
         entries = data.pop('entries')
         for entry in entries:
@@ -302,7 +589,7 @@ class LeagueApi(BaseApi):
                     league_id=data['league_id'],
                     **entry.pop('mini_series')
                 )
-            buffer.append(LeagueItemDto(region=region.name, league_id=data['league_id'], **entry))
+            buffer.append(dto_type(LeagueItemDto, records)(region=region.name, league_id=data['league_id'], **entry))
 
         data['entries'] = buffer
-        return LeagueListDto(region=region.name, **data)
+        return dto_type(LeagueListDto, records)(region=region.name, **data)
@@ -0,0 +1,140 @@
+from .static import Region
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, List
+import gzip
+import io
+import json
+import zlib
+
+
+SUFFIXES = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+
+def default_compression() -> str:
+    try:
+        import zstandard
+    except ImportError:
+        return 'gzip'
+    return 'zstd'
+
+
+@dataclass
+class ArchivedResponse:
+    region: str
+    endpoint: str
+    method_name: str
+    parameters: str
+    fetched: datetime
+    body: Dict
+
+
+class ResponseArchive:
+    # append-only json lines sharded as <directory>/<endpoint>/<yyyy-mm-dd>.jsonl.<gz|zst>;
+    # every record is written as its own compressed member/frame, so a crash never corrupts older records;
+    # compression defaults to zstd when zstandard is installed, shards of either kind are read back
+    def __init__(self, directory: str, compression: str=None, endpoints: List[str]=None, level: int=6):
+        if compression is None:
+            compression = default_compression()
+        if compression not in SUFFIXES:
+            raise ValueError(f"unknown compression '{compression}'")
+
+        self._directory = Path(directory)
+        self._compression = compression
+        self._endpoints = set(endpoints) if endpoints is not None else None
+        self._level = level
+        self._lock = Lock()
+
+    @property
+    def compression(self) -> str:
+        return self._compression
+
+    @property
+    def suffix(self) -> str:
+        return SUFFIXES[self._compression]
+
+    def archives(self, endpoint: str) -> bool:
+        return self._endpoints is None or endpoint in self._endpoints or endpoint.split('.')[0] in self._endpoints
+
+    def writer(self, region: Region, endpoint: str, method_name: str, parameters: str) -> 'ArchiveWriter':
+        return ArchiveWriter(self, region, endpoint, method_name, parameters)
+
+    def write(self, region: Region, endpoint: str, method_name: str, parameters: str, body: bytes):
+        if not self.archives(endpoint):
+            return
+
+        writer = self.writer(region, endpoint, method_name, parameters)
+        writer.write(body)
+        writer.commit()
+
+    def _compressobj(self):
+        if self._compression == 'gzip':
+            return zlib.compressobj(self._level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+        # a compressor context is not thread-safe, every record gets its own
+        import zstandard
+        return zstandard.ZstdCompressor(level=self._level).compressobj()
+
+    def _append(self, path: Path, data: bytes):
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'ab') as f:
+                f.write(data)
+
+    def shards(self, endpoint: str, start: date=None, end: date=None) -> List[Path]:
+        result = []
+        for path in sorted((self._directory / endpoint).glob('*.jsonl.*')):
+            if not path.name.endswith(tuple(SUFFIXES.values())):
+                continue
+            day = date.fromisoformat(path.name[:10])
+            if (start is None or day >= start) and (end is None or day <= end):
+                result.append(path)
+        return result
+
+    def iter(self, endpoint: str, start: date=None, end: date=None) -> Iterator[ArchivedResponse]:
+        for path in self.shards(endpoint, start, end):
+            with self._open(path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    record['fetched'] = datetime.fromisoformat(record['fetched'])
+                    yield ArchivedResponse(**record)
+
+    def _open(self, path: Path):
+        if path.name.endswith(SUFFIXES['gzip']):
+            return gzip.open(path, 'rb')
+
+        import zstandard
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+        return io.BufferedReader(raw)
+
+
+
+class ArchiveWriter:
+    # compresses the record while the body streams in, so only the compressed bytes are buffered;
+    # the member/frame is appended on commit. raw newlines in json are whitespace between tokens
+    # (inside strings they are always escaped) and are dropped to keep one record per line
+    def __init__(self, archive: ResponseArchive, region: Region, endpoint: str, method_name: str, parameters: str):
+        now = datetime.now()
+        header = json.dumps({
+            'region': region.name,
+            'endpoint': endpoint,
+            'method_name': method_name,
+            'parameters': parameters,
+            'fetched': now.isoformat()
+        })
+        self._archive = archive
+        self._path = archive._directory / endpoint / f'{now.date().isoformat()}{archive.suffix}'
+        self._compressor = archive._compressobj()
+        self._chunks = [self._compressor.compress(header[:-1].encode() + b',"body":')]
+
+    def write(self, chunk: bytes):
+        chunk = chunk.replace(b'\n', b'').replace(b'\r', b'')
+        self._chunks.append(self._compressor.compress(chunk))
+
+    def commit(self):
+        self._chunks.append(self._compressor.compress(b'}\n'))
+        self._chunks.append(self._compressor.flush())
+        self._archive._append(self._path, b''.join(self._chunks))
@@ -0,0 +1,120 @@
+from .api import LeagueApi
+from .static import Region, Queue
+from .dto import SummonerDto, LeagueEntryDto, LeagueListDto, MatchInfoDto
+from .transport import Transport
+from .ratelimit import RateLimiter
+from .cache import ResponseCache
+from .archive import ResponseArchive
+from .metrics import Instrumentation
+from .columnar import TimelineColumns
+from .database import Database
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Dict, Iterable, List
+from datetime import datetime
+import asyncio
+
+
+class AsyncLeagueApi:
+    # requests is blocking, so calls run on a thread pool sized to the transport pool
+    # while the rate limiter, caches and sockets stay shared with the wrapped LeagueApi
+    def __init__(self, api_key: str | List[str]=None, concurrency: int=10, transport: Transport=None,
+                 rate_limiter: RateLimiter=None, cache: ResponseCache=None, archive: ResponseArchive=None,
+                 api: LeagueApi=None, instrumentation: Instrumentation | List[Instrumentation]=None):
+        # only a LeagueApi built here is closed with this wrapper, an injected one stays usable by its owner
+        self._owns_api = api is None
+        if api is None:
+            if api_key is None:
+                raise ValueError('an api key is needed unless an api is given')
+            if transport is None:
+                transport = Transport(pool_size=concurrency)
+            api = LeagueApi(api_key, transport=transport, rate_limiter=rate_limiter, cache=cache, archive=archive,
+                            instrumentation=instrumentation)
+        self._api = api
+        self._concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    @property
+    def api(self) -> LeagueApi:
+        return self._api
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def query(self, region: Region, method_name: str, **kwargs) -> Dict:
+        return await self._run(self._api.query, region, method_name, **kwargs)
+
+    async def gather(self, aws: Iterable[Awaitable], concurrency: int=None) -> List:
+        semaphore = asyncio.Semaphore(concurrency or self._concurrency)
+
+        async def bounded(aw: Awaitable):
+            async with semaphore:
+                return await aw
+
+        return await asyncio.gather(*[bounded(n) for n in aws])
+
+    async def get_summoner(self, region: Region, name: str=None, account_id: str=None,
+                           summoner_id: str = None, puuid: str = None) -> SummonerDto:
+        return await self._run(self._api.get_summoner, region, name=name, account_id=account_id,
+                               summoner_id=summoner_id, puuid=puuid)
+
+    async def get_league_entries(self, region: Region, summoner_id: str) -> List[LeagueEntryDto]:
+        return await self._run(self._api.get_league_entries, region, summoner_id)
+
+    async def get_challenger_league(self, region: Region, queue: Queue) -> LeagueListDto:
+        return await self._run(self._api.get_challenger_league, region, queue)
+
+    async def get_grandmaster_league(self, region: Region, queue: Queue) -> LeagueListDto:
+        return await self._run(self._api.get_grandmaster_league, region, queue)
+
+    async def get_master_league(self, region: Region, queue: Queue) -> LeagueListDto:
+        return await self._run(self._api.get_master_league, region, queue)
+
+    async def get_match(self, region: Region, game_id: str, fetch_timeline: bool=False, lazy_timeline: bool=False,
+                        prefetch_timeline: bool=False, database: Database=None) -> MatchInfoDto:
+        # the match and its timeline are independent requests, with fetch_timeline both are in flight at once
+        if not fetch_timeline:
+            result = await self._run(self._api.query_match, region, game_id)
+            return self._api.build_match(region, game_id, result, lazy_timeline=lazy_timeline,
+                                         prefetch_timeline=prefetch_timeline, database=database)
+
+        result, timeline = await asyncio.gather(
+            self._run(self._api.query_match, region, game_id),
+            self.get_timeline(region, game_id)
+        )
+        return self._api.build_match(region, game_id, result, timeline)
+
+    async def get_timeline(self, region: Region, game_id: str, columnar: bool=False) -> Dict | TimelineColumns:
+        return await self._run(self._api.get_timeline, region, game_id, columnar=columnar)
+
+    async def get_match_history(self, region: Region, puuid : str, start: int=None, count: int=None,
+                                start_time: datetime=None, end_time: datetime=None, queue: Queue=None) -> List[str]:
+        return await self._run(self._api.get_match_history, region, puuid, start=start, count=count,
+                               start_time=start_time, end_time=end_time, queue=queue)
+
+    async def get_matches(self, region: Region, game_ids: Iterable[str], fetch_timeline: bool=False,
+                          lazy_timeline: bool=False, prefetch_timeline: bool=False, database: Database=None,
+                          concurrency: int=None) -> List[MatchInfoDto]:
+        return await self.gather([
+            self.get_match(region, n, fetch_timeline, lazy_timeline, prefetch_timeline, database) for n in game_ids
+        ], concurrency)
+
+    async def get_summoners(self, region: Region, puuids: Iterable[str], concurrency: int=None) -> List[SummonerDto]:
+        return await self.gather([self.get_summoner(region, puuid=n) for n in puuids], concurrency)
+
+    async def get_league_entries_bulk(self, region: Region, summoner_ids: Iterable[str],
+                                      concurrency: int=None) -> List[List[LeagueEntryDto]]:
+        return await self.gather([self.get_league_entries(region, n) for n in summoner_ids], concurrency)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._owns_api:
+            self._api.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
@@ -0,0 +1,273 @@
+from abc import ABC, abstractmethod
+from cachetools import Cache, TTLCache
+from cachetools.keys import hashkey
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from functools import wraps
+from threading import Lock
+from time import time
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import sqlite3
+import zlib
+
+
+NEVER = None
+
+DEFAULT_TTL: Dict[str, Optional[float]] = {
+    'MatchV5.match': NEVER,
+    'MatchV5.timeline': NEVER,
+    'LeagueV4': 60*5,
+}
+
+
+class ResponseCache(ABC):
+    def __init__(self, ttl: Dict[str, Optional[float]]=None):
+        self._ttl = dict(DEFAULT_TTL if ttl is None else ttl)
+
+    def cacheable(self, endpoint: str) -> bool:
+        return endpoint in self._ttl or endpoint.split('.')[0] in self._ttl
+
+    def ttl(self, endpoint: str) -> Optional[float]:
+        if endpoint in self._ttl:
+            return self._ttl[endpoint]
+        return self._ttl.get(endpoint.split('.')[0])
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    def entry(self, key: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        # the body with the fingerprint of the api key that fetched it, None when that is not known
+        body = self.get(key)
+        return None if body is None else (body, None)
+
+    @abstractmethod
+    def set(self, key: str, endpoint: str, value: bytes, fingerprint: str=None):
+        pass
+
+    def writer(self, key: str, endpoint: str, fingerprint: str=None) -> 'ResponseWriter':
+        return ResponseWriter(self, key, endpoint, fingerprint)
+
+    def close(self):
+        pass
+
+
+class ResponseWriter:
+    def __init__(self, cache: ResponseCache, key: str, endpoint: str, fingerprint: str=None):
+        self._cache = cache
+        self._key = key
+        self._endpoint = endpoint
+        self._fingerprint = fingerprint
+        self._chunks = []
+
+    def write(self, chunk: bytes):
+        self._chunks.append(chunk)
+
+    def commit(self):
+        self._cache.set(self._key, self._endpoint, b''.join(self._chunks), self._fingerprint)
+
+
+class SqliteResponseCache(ResponseCache):
+    def __init__(self, path: str='responses.db', max_size: int=1024**3, ttl: Dict[str, Optional[float]]=None,
+                 compression_level: int=6):
+        super().__init__(ttl)
+        self._max_size = max_size
+        self._compression_level = compression_level
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, endpoint TEXT, expires REAL, accessed REAL, size INTEGER, body BLOB, fingerprint TEXT)'
+        )
+        columns = [n[1] for n in self._connection.execute('PRAGMA table_info(responses)')]
+        if 'fingerprint' not in columns:
+            self._connection.execute('ALTER TABLE responses ADD COLUMN fingerprint TEXT')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.entry(key)
+        return None if entry is None else entry[0]
+
+    def entry(self, key: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        now = time()
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT expires, size, body, fingerprint FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            expires, size, body, fingerprint = row
+            if expires is not None and expires <= now:
+                self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._size -= size
+                return None
+
+            self._connection.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        return zlib.decompress(body), fingerprint
+
+    def set(self, key: str, endpoint: str, value: bytes, fingerprint: str=None):
+        if not self.cacheable(endpoint):
+            return
+
+        self._store(key, endpoint, zlib.compress(value, self._compression_level), fingerprint)
+
+    def writer(self, key: str, endpoint: str, fingerprint: str=None) -> ResponseWriter:
+        return SqliteResponseWriter(self, key, endpoint, fingerprint)
+
+    def _store(self, key: str, endpoint: str, body: bytes, fingerprint: str=None):
+        now = time()
+        ttl = self.ttl(endpoint)
+        with self._lock:
+            row = self._connection.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                self._size -= row[0]
+
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses (key, endpoint, expires, accessed, size, body, fingerprint) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, endpoint, None if ttl is None else now + ttl, now, len(body), body, fingerprint)
+            )
+            self._size += len(body)
+            if self._size > self._max_size:
+                self._evict()
+
+    def _evict(self):
+        now = time()
+        self._connection.execute('DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?', (now,))
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        rows = self._connection.execute('SELECT key, size FROM responses ORDER BY accessed')
+
+        evicted = []
+        for key, size in rows:
+            if self._size <= self._max_size:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._connection.executemany('DELETE FROM responses WHERE key = ?', evicted)
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM responses')
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class SqliteResponseWriter(ResponseWriter):
+    # compresses while the body streams in, so only the compressed bytes are buffered
+    def __init__(self, cache: SqliteResponseCache, key: str, endpoint: str, fingerprint: str=None):
+        super().__init__(cache, key, endpoint, fingerprint)
+        self._compressor = zlib.compressobj(cache._compression_level)
+
+    def write(self, chunk: bytes):
+        self._chunks.append(self._compressor.compress(chunk))
+
+    def commit(self):
+        self._chunks.append(self._compressor.flush())
+        self._cache._store(self._key, self._endpoint, b''.join(self._chunks), self._fingerprint)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), 'hit_ratio': self.hit_ratio}
+
+
+class StatsTTLCache(TTLCache):
+    def __init__(self, maxsize: int, ttl: float, stats: CacheStats):
+        super().__init__(maxsize, ttl)
+        self.stats = stats
+
+    def popitem(self):
+        item = super().popitem()
+        self.stats.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        size = Cache.__len__(self)
+        super().expire(time)
+        self.stats.expirations += size - Cache.__len__(self)
+
+
+class MethodCache:
+    def __init__(self, maxsize: int=1024, ttl: float=60, listener: Callable[[bool], None]=None):
+        self.stats = CacheStats()
+        self._listener = listener
+        self._cache = StatsTTLCache(maxsize, ttl, self.stats)
+        self._pending: Dict[Hashable, Future] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    def get_or_call(self, key: Hashable, func: Callable):
+        with self._lock:
+            try:
+                value = self._cache[key]
+                self.stats.hits += 1
+                hit = True
+            except KeyError:
+                hit = False
+                future = self._pending.get(key)
+                owner = future is None
+                if owner:
+                    future = self._pending[key] = Future()
+                    self.stats.misses += 1
+                else:
+                    self.stats.coalesced += 1
+
+        if self._listener is not None:
+            self._listener(hit or not owner)
+        if hit:
+            return value
+        if not owner:
+            return future.result()
+
+        try:
+            value = func()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._cache[key] = value
+            del self._pending[key]
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def cached_method(func: Callable) -> Callable:
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache = self._method_caches.get(func.__name__)
+        if cache is None:
+            return func(self, *args, **kwargs)
+        return cache.get_or_call(hashkey(*args, **kwargs), lambda: func(self, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,84 @@
+from .dto import MatchParticipantFramesDto, MatchEventDto
+
+from array import array
+from dataclasses import dataclass, fields
+from typing import Dict, List, Union
+
+
+PARTICIPANT_FRAME_COLUMNS = [n.name for n in fields(MatchParticipantFramesDto)]
+EVENT_COLUMNS = ['game_id', 'timeframe', 'sequence', 'kind', 'participant_id', 'timestamp']
+
+
+@dataclass
+class TimelineColumns:
+    participants: Dict[str, array]
+    events: Dict[str, Union[array, List[str]]]
+
+    @staticmethod
+    def empty() -> 'TimelineColumns':
+        return TimelineColumns(
+            participants={n: array('q') for n in PARTICIPANT_FRAME_COLUMNS},
+            events={n: [] if n == 'kind' else array('q') for n in EVENT_COLUMNS}
+        )
+
+    def extend(self, other: 'TimelineColumns'):
+        for name, column in other.participants.items():
+            self.participants[name].extend(column)
+        for name, column in other.events.items():
+            self.events[name].extend(column)
+
+    def to_numpy(self) -> Dict[str, Dict]:
+        import numpy
+
+        def convert(columns):
+            return {k: numpy.frombuffer(v, dtype=numpy.int64) if isinstance(v, array) else numpy.array(v, dtype=object)
+                    for k, v in columns.items()}
+
+        return {'participants': convert(self.participants), 'events': convert(self.events)}
+
+    def to_arrow(self) -> Dict:
+        import pyarrow
+
+        def convert(columns):
+            return pyarrow.table({k: pyarrow.array(v, type=pyarrow.int64()) if isinstance(v, array) else pyarrow.array(v)
+                                  for k, v in columns.items()})
+
+        return {'participants': convert(self.participants), 'events': convert(self.events)}
+
+
+def build_timeline_columns(data: Dict) -> TimelineColumns:
+    info = data['info']
+    game_id = info['game_id']
+    columns = TimelineColumns.empty()
+    participants = [(n, columns.participants[n].append) for n in PARTICIPANT_FRAME_COLUMNS]
+    events = columns.events
+
+    for frame in info['frames']:
+        timestamp = frame['timestamp']
+        for participant in frame['participant_frames'].values():
+            row = {
+                **participant['champion_stats'],
+                **participant['damage_stats'],
+                **participant['position'],
+                **participant,
+                'game_id': game_id,
+                'timestamp': timestamp
+            }
+            for name, append in participants:
+                append(row[name])
+
+        for sequence, event in enumerate(frame['events']):
+            try:
+                key = MatchEventDto.participant_key(event['type'])
+            except KeyError:
+                continue
+
+            participant_id = event[key] if key else None
+            events['game_id'].append(game_id)
+            events['timeframe'].append(timestamp)
+            events['sequence'].append(sequence)
+            events['kind'].append(event['type'])
+            events['participant_id'].append(-1 if participant_id is None else participant_id)
+            events['timestamp'].append(event['timestamp'])
+
+    return columns
@@ -1,17 +1,136 @@
-from typing import Iterable
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
-from .dto import metadata, Dto
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from datetime import datetime
+from time import monotonic, perf_counter
+from sqlalchemy import create_engine, event, select, func, case, and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from .dto import (
+    metadata, flatten, Dto, MatchInfoDto, MatchParticipantDto, MatchParticipantFramesDto, MatchEventDto, LeagueEntryDto
+)
+from .static import Region, Queue, Tier, Division
+from .record import Record, to_mapped
+from .metrics import Instrumentation, instrumentation_of
+
+
+UPSERT = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def as_list(entity: Iterable | object) -> Iterable:
+    return [entity] if isinstance(entity, (Dto, Record)) else entity
+
+
+class UnitOfWork:
+    # commits and empties its session whenever `max_objects` are held or `max_seconds` have passed,
+    # checked on every add/merge; committed objects are detached but keep their loaded state
+    def __init__(self, session: Session, max_objects: int=10_000, max_seconds: float=30.0):
+        self._session = session
+        self._max_objects = max_objects
+        self._max_seconds = max_seconds
+        self._started = monotonic()
+
+    @property
+    def session(self) -> Session:
+        return self._session
+
+    @property
+    def pending(self) -> int:
+        return len(self._session.new) + len(self._session.identity_map)
+
+    def add(self, entity: Iterable[Dto] | Dto):
+        for n in as_list(entity):
+            self._session.add(n)
+            self._check()
+
+    def merge(self, entity: Iterable[Dto] | Dto):
+        for n in as_list(entity):
+            self._session.merge(n)
+            self._check()
+
+    def commit(self):
+        self._session.commit()
+        self._session.expunge_all()
+        self._started = monotonic()
+
+    def _check(self):
+        if self.pending >= self._max_objects or monotonic() - self._started >= self._max_seconds:
+            self.commit()
 
 
 class Database:
-    def __init__(self, connection_string: str='sqlite:///league.db') -> None:
+    def __init__(self, connection_string: str='sqlite:///league.db',
+                 instrumentation: Instrumentation | List[Instrumentation]=None) -> None:
         self._engine = create_engine(connection_string, future=True)
-        self._session = Session(self._engine)
+        self._instrumentation = instrumentation_of(instrumentation)
+        # one session per thread for `session`, so workers sharing a Database never share a Session
+        self._factory = sessionmaker(self._engine, future=True)
+        self._work_factory = sessionmaker(self._engine, future=True, expire_on_commit=False)
+        self._sessions = scoped_session(self._factory)
+        self._timeline_store = None
+        self._instrument(self._factory)
+        self._instrument(self._work_factory)
+
+    def _instrument(self, factory: sessionmaker):
+        # flush and commit durations are taken from session events, so commits issued by callers count too
+        def start(name: str):
+            def listener(session, *args):
+                session.info[name] = perf_counter()
+            return listener
+
+        def stop(name: str):
+            def listener(session, *args):
+                started = session.info.pop(name, None)
+                if started is not None:
+                    self._instrumentation.on_database(name, perf_counter() - started)
+            return listener
+
+        event.listen(factory, 'before_flush', start('flush'))
+        event.listen(factory, 'after_flush_postexec', stop('flush'))
+        event.listen(factory, 'before_commit', start('commit'))
+        event.listen(factory, 'after_commit', stop('commit'))
 
     @property
     def session(self) -> Session:
-        return self._session
+        return self._sessions()
+
+    @contextmanager
+    def unit_of_work(self, max_objects: int=10_000, max_seconds: float=30.0) -> Iterator[UnitOfWork]:
+        session = self._work_factory()
+        work = UnitOfWork(session, max_objects, max_seconds)
+        try:
+            yield work
+            work.commit()
+        except BaseException:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def release(self):
+        # closes the calling thread's session, worker threads call this before they exit
+        self._sessions.remove()
+
+    def close(self):
+        self._sessions.remove()
+        self._engine.dispose()
+
+    @property
+    def engine(self) -> Engine:
+        return self._engine
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        return self._instrumentation
+
+    @property
+    def timeline_store(self):
+        # set by a TimelineStore on construction, timeline reads then go to its partitions first
+        return self._timeline_store
+
+    @timeline_store.setter
+    def timeline_store(self, store):
+        self._timeline_store = store
 
     def create_schema(self, overwrite=False):
         if overwrite:
@@ -21,15 +140,153 @@ class Database:
 
     def drop_schema(self):
         metadata.drop_all(self._engine)
+
+    def create_indexes(self):
+        # create_all skips existing tables, so indexes declared after a database was created land here
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(self._engine, checkfirst=True)
     
-    def add(self, entity: Iterable[Dto] | Dto):
-        self.session.add_all(entity)
+    def add(self, entity: Iterable[Dto] | Dto, batch_size: int=10_000):
+        with self.unit_of_work(max_objects=batch_size) as work:
+            work.add(entity)
+
+    def merge(self, entity: Iterable[Dto] | Dto, batch_size: int=10_000):
+        with self.unit_of_work(max_objects=batch_size) as work:
+            work.merge(entity)
+
+    def upsert(self, entity: Iterable[Dto | Record] | Dto | Record, batch_size: int=1000):
+        if self._engine.dialect.name not in UPSERT:
+            self.merge(to_mapped(entity), batch_size)
+            return
+
+        self.upsert_rows(self.rows_of(entity), batch_size)
+
+    def upsert_rows(self, rows: Dict[str, Iterable[Dict | tuple]], batch_size: int=1000):
+        insert = UPSERT.get(self._engine.dialect.name)
+        if insert is None:
+            raise NotImplementedError(f'upsert is not supported for {self._engine.dialect.name}')
+
+        for table in metadata.sorted_tables:
+            if table.name not in rows:
+                continue
+
+            columns = [n.name for n in table.columns]
+            primary_key = [n.name for n in table.primary_key.columns]
+            unique = {}
+            for row in rows[table.name]:
+                if not isinstance(row, dict):
+                    row = dict(zip(columns, row))
+                unique[tuple(row[n] for n in primary_key)] = row
+
+            statement = insert(table)
+            update = {n.name: statement.excluded[n.name] for n in table.columns if not n.primary_key}
+            if update:
+                statement = statement.on_conflict_do_update(index_elements=table.primary_key.columns, set_=update)
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=table.primary_key.columns)
+
+            buffer = list(unique.values())
+            started = perf_counter()
+            for n in range(0, len(buffer), batch_size):
+                self.session.execute(statement, buffer[n:n+batch_size])
+            self._instrumentation.on_database(f'upsert.{table.name}', perf_counter() - started, len(buffer))
+
         self.session.commit()
-            
 
-    def merge(self, entity: Iterable[Dto] | Dto):
-        try:
-            for n in entity:
-                self.session.merge(n)
-        except TypeError:
-            self.session.merge(entity)
\ No newline at end of file
+    @staticmethod
+    def rows_of(entity: Iterable[Dto | Record] | Dto | Record) -> Dict[str, List[tuple]]:
+        rows = {}
+        for table, nodes in flatten(entity).items():
+            columns = [n.name for n in table.columns]
+            rows[table.name] = [tuple(getattr(node, n) for n in columns) for node in nodes]
+        return rows
+
+    def timeline(self, game_id: int) -> Optional[Dict[str, List]]:
+        if self._timeline_store is not None:
+            rows = self._timeline_store.read(game_id)
+            if rows is not None and (rows['participants'] or rows['events']):
+                return {
+                    'participants': [MatchParticipantFramesDto(**n._mapping) for n in rows['participants']],
+                    'events': [MatchEventDto(**n._mapping) for n in rows['events']],
+                }
+
+        participants = self.session.execute(
+            select(MatchParticipantFramesDto).where(MatchParticipantFramesDto.game_id == game_id)
+            .order_by(MatchParticipantFramesDto.timestamp, MatchParticipantFramesDto.participant_id)
+        ).scalars().all()
+        events = self.session.execute(
+            select(MatchEventDto).where(MatchEventDto.game_id == game_id)
+            .order_by(MatchEventDto.timeframe, MatchEventDto.sequence)
+        ).scalars().all()
+        if not participants and not events:
+            return None
+        return {'participants': participants, 'events': events}
+
+    def recent_matches(self, puuid: str, queue_id: int=None, before: Tuple[datetime, int]=None,
+                       limit: int=20) -> List[Row]:
+        # keyset pagination: pass (game_creation, game_id) of the last row as `before` to get the next page,
+        # the game_id breaks ties between games created at the same time
+        statement = (
+            select(
+                MatchInfoDto.game_id, MatchInfoDto.game_creation, MatchInfoDto.game_duration, MatchInfoDto.queue_id,
+                MatchInfoDto.game_version, MatchParticipantDto.champion_id, MatchParticipantDto.champion_name,
+                MatchParticipantDto.team_position, MatchParticipantDto.kills, MatchParticipantDto.deaths,
+                MatchParticipantDto.assists, MatchParticipantDto.win
+            )
+            .join(MatchParticipantDto, MatchParticipantDto.game_id == MatchInfoDto.game_id)
+            .where(MatchParticipantDto.puuid == puuid)
+            .order_by(MatchInfoDto.game_creation.desc(), MatchInfoDto.game_id.desc())
+            .limit(limit)
+        )
+        if queue_id is not None:
+            statement = statement.where(MatchInfoDto.queue_id == queue_id)
+        if before is not None:
+            game_creation, game_id = before
+            statement = statement.where(or_(
+                MatchInfoDto.game_creation < game_creation,
+                and_(MatchInfoDto.game_creation == game_creation, MatchInfoDto.game_id < game_id)
+            ))
+        return self.session.execute(statement).all()
+
+    def champion_win_rates(self, game_version: str=None, queue_id: int=None, min_games: int=1,
+                           limit: int=50, offset: int=0) -> List[Row]:
+        # game_version matches a full version or a patch prefix, e.g. '12.8' covers '12.8.425.3026';
+        # versions are ordered by their latest game, newest first, as text '12.10' would sort before '12.9'
+        games = func.count()
+        wins = func.sum(case((MatchParticipantDto.win, 1), else_=0))
+        statement = (
+            select(
+                MatchInfoDto.game_version, MatchParticipantDto.champion_id, MatchParticipantDto.champion_name,
+                games.label('games'), wins.label('wins'), (wins * 1.0 / games).label('win_rate')
+            )
+            .join(MatchParticipantDto, MatchParticipantDto.game_id == MatchInfoDto.game_id)
+            .group_by(MatchInfoDto.game_version, MatchParticipantDto.champion_id, MatchParticipantDto.champion_name)
+            .having(games >= min_games)
+            .order_by(func.max(MatchInfoDto.game_creation).desc(), games.desc(), MatchParticipantDto.champion_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        if game_version is not None:
+            statement = statement.where(or_(
+                MatchInfoDto.game_version == game_version,
+                MatchInfoDto.game_version.startswith(f'{game_version}.')
+            ))
+        if queue_id is not None:
+            statement = statement.where(MatchInfoDto.queue_id == queue_id)
+        return self.session.execute(statement).all()
+
+    def ladder_snapshot(self, region: Region, queue: Queue, tier: Tier | str, division: Division | str=None,
+                        limit: int=100, offset: int=0) -> List[LeagueEntryDto]:
+        tier = tier.value if isinstance(tier, Tier) else tier
+        statement = (
+            select(LeagueEntryDto)
+            .where(LeagueEntryDto.tier == tier, LeagueEntryDto.queue_type == queue.value,
+                   LeagueEntryDto.region == region.name)
+            .order_by(LeagueEntryDto.rank, LeagueEntryDto.league_points.desc(), LeagueEntryDto.summoner_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        if division is not None:
+            statement = statement.where(LeagueEntryDto.rank == (division.value if isinstance(division, Division) else division))
+        return self.session.execute(statement).scalars().all()
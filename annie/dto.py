@@ -1,9 +1,9 @@
 from __future__ import annotations
 from abc import ABC
-from dataclasses import dataclass, field
-from typing import List, Dict, Union, Optional
+from dataclasses import dataclass, field, fields
+from typing import Iterator, List, Dict, Tuple, Union, Optional
 from sqlalchemy.orm import registry, backref, relation, relationship
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, BigInteger, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, BigInteger, ForeignKey, Index, Table, inspect
 from sqlalchemy.sql.schema import ForeignKeyConstraint
 from datetime import datetime
 
@@ -13,29 +13,62 @@ metadata = mapper_registry.metadata
 Base = mapper_registry.generate_base()
 
 class Dto(ABC):
+    @classmethod
+    def relationships(cls) -> Tuple[str, ...]:
+        names = cls.__dict__.get('_relationships')
+        if names is None:
+            names = tuple(inspect(cls).relationships.keys())
+            cls._relationships = names
+        return names
+
     def to_dto(self):
-        buffer = []
-        buffer.append(self)
-        attributes = [n for n in dir(self) if not n.startswith('__') and n != 'dto']
-        for attr in attributes:
-            value = getattr(self, attr)
-            if isinstance(value, list):
-                for element in value:
-                    if issubclass(type(element), Dto):
-                        buffer.extend(element.to_dto())
-            if issubclass(type(value), Dto):
-                buffer.append(value)
-        return buffer
+        return list(walk(self))
 
     def to_dict(self):
         return {k: v for (k, v) in self.__dict__.items() if k > 'a'}
 
 
+def walk(entity) -> Iterator:
+    # iterative pre-order walk over the relationship graph; every object is emitted once
+    stack = [entity] if hasattr(entity, 'relationships') else list(reversed(list(entity)))
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+
+        # loaders registered on the instance that were never resolved (a deferred timeline) are not forced
+        state = getattr(node, '_sa_instance_state', None)
+        pending = state.callables if state is not None else None
+        for name in reversed(node.relationships()):
+            if pending and name in pending and name not in state.dict:
+                continue
+            value = getattr(node, name)
+            if isinstance(value, list):
+                stack.extend(reversed(value))
+            elif value is not None:
+                stack.append(value)
+
+
+def flatten(entity) -> Dict[Table, List]:
+    grouped = {}
+    for node in walk(entity):
+        table = node.__table__
+        if table in grouped:
+            grouped[table].append(node)
+        else:
+            grouped[table] = [node]
+    return grouped
+
+
 @mapper_registry.mapped
 @dataclass
 class SummonerDto(Dto):
     __tablename__ = 'summoner'
     __sa_dataclass_metadata_key__ = 'sa'
+    __table_args__ = (Index('ix_summoner_puuid', 'puuid'), {})
 
     region: str = field(metadata={'sa': Column(String(30), primary_key=True)})
     summoner_id: str = field(metadata={'sa': Column(String(63), primary_key=True)})
@@ -69,6 +102,7 @@ class MiniSeriesDto(Dto):
 class LeagueEntryDto(Dto):
     __tablename__ = 'league_entry'
     __sa_dataclass_metadata_key__ = 'sa'
+    __table_args__ = (Index('ix_league_entry_tier', 'tier', 'queue_type', 'rank', 'league_points'), {})
 
     region: str = field(metadata={'sa': Column(String(30), primary_key=True)})
     summoner_id: str = field(metadata={'sa': Column(String(63), primary_key=True)})
@@ -166,7 +200,12 @@ class MatchStylePerksDto(Dto):
 class MatchParticipantDto(Dto):
     __tablename__ = 'participants'
     __sa_dataclass_metadata_key__ = 'sa'
-    __table_args__ = (ForeignKeyConstraint(['game_id'], ['matches.game_id']), {})
+    __table_args__ = (
+        ForeignKeyConstraint(['game_id'], ['matches.game_id']),
+        Index('ix_participants_puuid', 'puuid', 'game_id'),
+        Index('ix_participants_champion_id', 'champion_id', 'game_id'),
+        {}
+    )
 
     game_id: int = field(metadata={'sa': Column(BigInteger, primary_key=True)})
     team_id: int = field(metadata={'sa': Column(Integer, primary_key=True)})
@@ -401,24 +440,40 @@ class MatchEventDto(Dto):
     timestamp: int = field(metadata={'sa': Column(BigInteger)})
 
     @staticmethod
-    def parse(**kwargs) -> MatchEventDto:
-        if 'type' not in kwargs:
-            raise ValueError(f'{kwargs} is not an valid event')
-
-        match kwargs['type']:
+    def participant_key(kind: str) -> Optional[str]:
+        match kind:
             case 'LEVEL_UP' | 'ITEM_PURCHASED' | 'SKILL_LEVEL_UP' | 'ITEM_DESTROYED' | 'ITEM_SOLD' | 'ITEM_UNDO':
-                pass
+                return 'participant_id'
             case 'WARD_KILL' | 'BUILDING_KILL' | 'CHAMPION_KILL' | 'TURRET_PLATE_DESTROYED' | 'CHAMPION_SPECIAL_KILL' | 'ELITE_MONSTER_KILL':
-                kwargs['participant_id'] = kwargs.pop('killer_id')
+                return 'killer_id'
             case 'WARD_PLACED':
-                kwargs['participant_id'] = kwargs.pop('creator_id')
+                return 'creator_id'
             case 'DRAGON_SOUL_GIVEN' | 'PAUSE_END' | 'GAME_END' | 'OBJECTIVE_BOUNTY_PRESTART' | 'OBJECTIVE_BOUNTY_FINISH':
-                kwargs['participant_id'] = None
-            case _:
-                print(f"the event '{kwargs['type']}' is not defined yet")
                 return None
+            case _:
+                raise KeyError(kind)
+
+    @staticmethod
+    def parse(**kwargs) -> MatchEventDto:
+        values = MatchEventDto.parse_fields(**kwargs)
+        if values is None:
+            return None
+        return MatchEventDto(**values)
+
+    @staticmethod
+    def parse_fields(**kwargs) -> Optional[Dict]:
+        if 'type' not in kwargs:
+            raise ValueError(f'{kwargs} is not an valid event')
+
+        try:
+            key = MatchEventDto.participant_key(kwargs['type'])
+        except KeyError:
+            print(f"the event '{kwargs['type']}' is not defined yet")
+            return None
 
-        return MatchEventDto(
+        kwargs['participant_id'] = kwargs[key] if key else None
+
+        return dict(
             game_id = kwargs['game_id'],
             timeframe = kwargs['timeframe'],
             sequence = kwargs['sequence'],
@@ -449,6 +504,11 @@ class MatchTeamDto(Dto):
 class MatchInfoDto(Dto):
     __tablename__ = 'matches'
     __sa_dataclass_metadata_key__ = 'sa'
+    __table_args__ = (
+        Index('ix_matches_game_creation', 'game_creation'),
+        Index('ix_matches_queue_id', 'queue_id', 'game_version'),
+        {}
+    )
 
     platform_id: str = field(metadata={'sa': Column(String(10))})
     game_id: int = field(metadata={'sa': Column(BigInteger, primary_key=True)})
@@ -468,4 +528,26 @@ class MatchInfoDto(Dto):
     participants: List[MatchParticipantDto] = relationship('MatchParticipantDto')
     teams: List[MatchTeamDto] = relationship('MatchTeamDto')
     timeline_participants: Optional[List[MatchParticipantFramesDto]] = relationship('MatchParticipantFramesDto')
-    timeline_events: Optional[List[MatchEventDto]] = relationship('MatchEventDto')
\ No newline at end of file
+    timeline_events: Optional[List[MatchEventDto]] = relationship('MatchEventDto')
+
+    def __repr__(self) -> str:
+        # an unloaded (e.g. deferred) timeline is left out instead of being fetched just to be printed
+        unloaded = inspect(self).unloaded & {'timeline_participants', 'timeline_events'}
+        values = ', '.join(f'{n.name}={getattr(self, n.name)!r}' for n in fields(self) if n.name not in unloaded)
+        return f'{type(self).__name__}({values})'
+
+
+@mapper_registry.mapped
+@dataclass
+class MatchHistoryWatermarkDto(Dto):
+    __tablename__ = 'match_history_watermark'
+    __sa_dataclass_metadata_key__ = 'sa'
+
+    region: str = field(metadata={'sa': Column(String(30), primary_key=True)})
+    puuid: str = field(metadata={'sa': Column(String(78), primary_key=True)})
+    # every queue filter keeps its own mark, '' is the unfiltered history
+    queue: str = field(metadata={'sa': Column(String(30), primary_key=True)})
+
+    last_match_id: str = field(metadata={'sa': Column(String(30))})
+    last_game_end: datetime = field(metadata={'sa': Column(DateTime)})
+    synced_at: datetime = field(metadata={'sa': Column(DateTime)})
\ No newline at end of file
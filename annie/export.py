@@ -0,0 +1,124 @@
+from .database import Database
+from .dto import metadata, MatchInfoDto
+from .partition import timeline_partitions
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+from sqlalchemy import MetaData, Table, select, or_
+from sqlalchemy.types import BigInteger, Boolean, DateTime, Float, Integer, String
+
+
+EXPORT_TABLES = [
+    'matches', 'participants', 'stat_perks', 'style_perks', 'teams', 'bans', 'objectives',
+    'timeline_participants', 'timeline_events',
+]
+
+
+class ArrowExporter:
+    # streams tables out of the database in batches through a server-side cursor and writes them
+    # as parquet or arrow ipc files, one per table; at most one batch of rows is held in memory.
+    # by default every timeline partition written by a TimelineStore is exported next to the base tables
+    def __init__(self, database: Database, format: str='parquet', batch_size: int=50_000,
+                 compression: str='zstd'):
+        if format not in ('parquet', 'arrow'):
+            raise ValueError(f"unknown format '{format}'")
+
+        self._database = database
+        self._format = format
+        self._batch_size = batch_size
+        self._compression = compression
+
+    def table(self, name: str) -> Table:
+        # partition tables written by TimelineStore are not part of the dto metadata and are reflected
+        if name in metadata.tables:
+            return metadata.tables[name]
+        return Table(name, MetaData(), autoload_with=self._database.engine)
+
+    def statement(self, table: Table, queue_id: int=None, patch: str=None, start: datetime=None,
+                  end: datetime=None):
+        matches = MatchInfoDto.__table__
+        conditions = []
+        if queue_id is not None:
+            conditions.append(matches.c.queue_id == queue_id)
+        if patch is not None:
+            conditions.append(or_(matches.c.game_version == patch, matches.c.game_version.startswith(f'{patch}.')))
+        if start is not None:
+            conditions.append(matches.c.game_creation >= start)
+        if end is not None:
+            conditions.append(matches.c.game_creation < end)
+
+        statement = select(table)
+        if not conditions:
+            return statement
+        if table is matches:
+            return statement.where(*conditions)
+        return statement.where(table.c.game_id.in_(select(matches.c.game_id).where(*conditions)))
+
+    def iter_batches(self, table: Table, **filters) -> Iterator[Dict[str, List]]:
+        columns = [n.name for n in table.columns]
+        with self._database.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, max_row_buffer=self._batch_size).execute(
+                self.statement(table, **filters)
+            )
+            for rows in result.partitions(self._batch_size):
+                yield {name: list(values) for name, values in zip(columns, zip(*rows))}
+
+    def export_table(self, name: str, path: str | Path, **filters) -> int:
+        import pyarrow
+
+        table = self.table(name)
+        schema = arrow_schema(table)
+        writer = self._writer(path, schema)
+        rows = 0
+        try:
+            for batch in self.iter_batches(table, **filters):
+                writer.write_table(pyarrow.Table.from_pydict(batch, schema=schema))
+                rows += len(batch[schema.names[0]])
+        finally:
+            writer.close()
+        return rows
+
+    def export(self, directory: str | Path, tables: Iterable[str]=None, queue_id: int=None, patch: str=None,
+               start: datetime=None, end: datetime=None) -> Dict[str, int]:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        suffix = '.parquet' if self._format == 'parquet' else '.arrow'
+        result = {}
+        if tables is None:
+            tables = EXPORT_TABLES + timeline_partitions(self._database.engine)
+        for name in tables:
+            result[name] = self.export_table(name, directory / f'{name}{suffix}', queue_id=queue_id, patch=patch,
+                                             start=start, end=end)
+        return result
+
+    def _writer(self, path: str | Path, schema):
+        if self._format == 'parquet':
+            import pyarrow.parquet
+            return pyarrow.parquet.ParquetWriter(str(path), schema, compression=self._compression)
+
+        import pyarrow.ipc
+        return pyarrow.ipc.new_file(str(path), schema)
+
+
+def arrow_schema(table: Table):
+    import pyarrow
+
+    fields = []
+    for column in table.columns:
+        match column.type:
+            case BigInteger() | Integer():
+                kind = pyarrow.int64()
+            case Boolean():
+                kind = pyarrow.bool_()
+            case DateTime():
+                kind = pyarrow.timestamp('us')
+            case Float():
+                kind = pyarrow.float64()
+            case String():
+                kind = pyarrow.string()
+            case _:
+                raise TypeError(f'no arrow type for {column.type!r} of {table.name}.{column.name}')
+        fields.append(pyarrow.field(column.name, kind, nullable=not column.primary_key))
+    return pyarrow.schema(fields)
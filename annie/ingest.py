@@ -0,0 +1,139 @@
+from .api import LeagueApi
+from .database import Database
+from .dto import MatchInfoDto
+from .partition import TimelineStore, TIMELINE_TABLES
+from .static import Region, Queue
+from .exception import ApiException
+from .utility import game_id_of
+
+from requests import RequestException
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Set
+from time import monotonic
+from sqlalchemy import select
+
+
+@dataclass
+class IngestReport:
+    requested: int = 0
+    skipped: int = 0
+    fetched: int = 0
+    failed: int = 0
+    committed: int = 0
+    started: float = field(default_factory=monotonic)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        return monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return self.fetched / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f'{self.committed}/{self.requested - self.skipped} matches stored, '
+                f'{self.skipped} skipped, {self.failed} failed, '
+                f'{self.throughput:.2f} matches/s in {self.elapsed:.1f}s')
+
+
+class IngestPipeline:
+    def __init__(self, api: LeagueApi, database: Database, workers: int=8, batch_size: int=50,
+                 fetch_timeline: bool=False, progress: Callable[[IngestReport], None]=None,
+                 timeline_store: TimelineStore=None):
+        self._api = api
+        self._database = database
+        self._workers = workers
+        self._batch_size = batch_size
+        self._fetch_timeline = fetch_timeline
+        self._progress = progress
+        self._timeline_store = timeline_store
+
+    def stored_game_ids(self, game_ids: Iterable[int], chunk_size: int=500) -> Set[int]:
+        game_ids = list(game_ids)
+        stored = set()
+        for n in range(0, len(game_ids), chunk_size):
+            statement = select(MatchInfoDto.game_id).where(MatchInfoDto.game_id.in_(game_ids[n:n+chunk_size]))
+            stored.update(self._database.session.execute(statement).scalars())
+        return stored
+
+    def ingest(self, region: Region, match_ids: Iterable[str]) -> IngestReport:
+        report = IngestReport()
+        match_ids = list(dict.fromkeys(match_ids))
+        report.requested = len(match_ids)
+
+        stored = self.stored_game_ids(game_id_of(n) for n in match_ids)
+        pending = [n for n in match_ids if game_id_of(n) not in stored]
+        report.skipped = len(match_ids) - len(pending)
+
+        batch: List[MatchInfoDto] = []
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            queue = iter(pending)
+            running = {}
+            while True:
+                while len(running) < self._workers * 2:
+                    match_id = next(queue, None)
+                    if match_id is None:
+                        break
+                    running[executor.submit(self._api.get_match, region, match_id, self._fetch_timeline)] = match_id
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    match_id = running.pop(future)
+                    try:
+                        batch.append(future.result())
+                        report.fetched += 1
+                    except ApiException as e:
+                        report.failed += 1
+                        report.errors[match_id] = f'{e.status_code}: {e.message}'
+                    except (ValueError, KeyError, TypeError) as e:
+                        # a malformed body only loses its own match; checked first as requests' json errors are both
+                        report.failed += 1
+                        report.errors[match_id] = f'parse failed: {e!r}'
+                    except RequestException as e:
+                        report.failed += 1
+                        report.errors[match_id] = f'request failed: {e}'
+
+                if len(batch) >= self._batch_size:
+                    self._commit(batch, report)
+                    batch = []
+
+        if batch:
+            self._commit(batch, report)
+        return report
+
+    def ingest_history(self, region: Region, puuids: Iterable[str], count: int=100, queue: Queue=None) -> IngestReport:
+        match_ids = []
+        errors = {}
+        for puuid in puuids:
+            try:
+                match_ids.extend(self._api.get_match_history(region, puuid, count=count, queue=queue))
+            except ApiException as e:
+                errors[puuid] = f'{e.status_code}: {e.message}'
+            except RequestException as e:
+                errors[puuid] = f'request failed: {e}'
+
+        report = self.ingest(region, match_ids)
+        report.errors.update(errors)
+        return report
+
+    def _commit(self, batch: List[MatchInfoDto], report: IngestReport):
+        if self._timeline_store is None:
+            self._database.upsert(batch)
+        else:
+            rows = Database.rows_of(batch)
+            timeline = {n.name: rows.pop(n.name, []) for n in TIMELINE_TABLES}
+            # partitions first: a match row is only visible once its timeline is complete,
+            # and a batch that fails here is simply ingested again (partitions skip stored games)
+            self._timeline_store.write_rows(timeline, {
+                n.game_id: self._timeline_store.suffix(n.game_creation, n.game_version) for n in batch
+            })
+            self._database.upsert_rows(rows)
+        report.committed += len(batch)
+        if self._progress:
+            self._progress(report)
@@ -0,0 +1,84 @@
+from .ratelimit import RateLimiter
+from .static import Region
+
+from cachetools import LRUCache
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, Optional
+
+
+def fingerprint(api_key: str) -> str:
+    # identifies a key in stored responses without storing the key itself
+    return sha256(api_key.encode()).hexdigest()[:16]
+
+
+class ApiKeyPool:
+    def __init__(self, api_keys: List[str], rate_limiter: RateLimiter, invalid_cooldown: float=60*60,
+                 max_pins: int=100_000):
+        if not api_keys:
+            raise ValueError('at least one api key is required')
+        self._keys = list(dict.fromkeys(api_keys))
+        self._fingerprints = {fingerprint(n): n for n in self._keys}
+        self._rate_limiter = rate_limiter
+        self._invalid_cooldown = invalid_cooldown
+        self._disabled: Dict[str, float] = {}
+        self._pins = LRUCache(maxsize=max_pins)
+        self._lock = Lock()
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    def key_of(self, fingerprint: Optional[str]) -> Optional[str]:
+        return self._fingerprints.get(fingerprint)
+
+    def active(self) -> List[str]:
+        now = monotonic()
+        with self._lock:
+            return [n for n in self._keys if self._disabled.get(n, 0.0) <= now]
+
+    def select(self, region: Region, endpoint: str, pin: str=None) -> str:
+        if pin is not None:
+            with self._lock:
+                key = self._pins.get(pin)
+            if key is not None:
+                return key
+
+        candidates = self.active()
+        if candidates:
+            key = max(candidates, key=lambda n: self._rate_limiter.headroom(region, endpoint, n))
+        else:
+            with self._lock:
+                key = min(self._keys, key=lambda n: self._disabled.get(n, 0.0))
+
+        if pin is not None:
+            with self._lock:
+                key = self._pins.setdefault(pin, key)
+        return key
+
+    def pin(self, api_key: str, *ids: str):
+        with self._lock:
+            for n in ids:
+                if n is not None:
+                    self._pins[n] = api_key
+
+    def unpin(self, *ids: str):
+        with self._lock:
+            for n in ids:
+                self._pins.pop(n, None)
+
+    def pinned(self, id: str) -> Optional[str]:
+        with self._lock:
+            return self._pins.get(id)
+
+    def report(self, api_key: str, status_code: int, retry_after: float=0.0):
+        if status_code in (401, 403):
+            cooldown = self._invalid_cooldown
+        elif status_code == 429:
+            cooldown = retry_after
+        else:
+            return
+
+        with self._lock:
+            self._disabled[api_key] = max(self._disabled.get(api_key, 0.0), monotonic() + cooldown)
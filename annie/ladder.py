@@ -0,0 +1,109 @@
+from .api import LeagueApi
+from .database import Database
+from .dto import LeagueEntryDto
+from .static import Region, Queue, Tier, Division
+
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue as Channel, Full
+from threading import Event
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DONE = object()
+
+
+def ladder_divisions(tiers: Iterable[Tier]=Tier,
+                     divisions: Iterable[Division]=Division) -> List[Tuple[Tier, Optional[Division]]]:
+    # apex tiers have no divisions and are listed once with None
+    divisions = list(divisions)
+    result = []
+    for tier in tiers:
+        if tier.is_apex:
+            result.append((tier, None))
+        else:
+            result.extend((tier, n) for n in divisions)
+    return result
+
+
+class LadderCrawler:
+    # a failing division is skipped and reported through on_error and errors, the rest of the ladder still arrives
+    def __init__(self, api: LeagueApi, workers: int=8, buffer: int=32,
+                 on_error: Callable[[Tier, Optional[Division], Exception], None]=None):
+        self._api = api
+        self._workers = workers
+        self._buffer = buffer
+        self._on_error = on_error
+        self.errors: Dict[Tuple[Tier, Optional[Division]], Exception] = {}
+
+    def iter_entries(self, region: Region, queue: Queue, tiers: Iterable[Tier]=Tier,
+                     divisions: Iterable[Division]=Division) -> Iterator[List[LeagueEntryDto]]:
+        # every division is paged by its own worker until the first empty page;
+        # pages are handed over through a bounded channel as soon as they arrive
+        channel = Channel(maxsize=self._buffer)
+        stop = Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    channel.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    pass
+            return False
+
+        def walk(tier: Tier, division: Optional[Division]):
+            try:
+                if division is None:
+                    entries = self._api.get_apex_league_entries(region, queue, tier)
+                    if entries:
+                        put(entries)
+                    return
+
+                page = 1
+                while not stop.is_set():
+                    entries = self._api.get_league_entries_page(region, queue, tier, division, page)
+                    if not entries or not put(entries):
+                        break
+                    page += 1
+            except Exception as e:
+                put((tier, division, e))
+            finally:
+                put(DONE)
+
+        tasks = ladder_divisions(tiers, divisions)
+        self.errors = {}
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            for tier, division in tasks:
+                executor.submit(walk, tier, division)
+
+            try:
+                remaining = len(tasks)
+                while remaining:
+                    item = channel.get()
+                    if item is DONE:
+                        remaining -= 1
+                    elif isinstance(item, tuple):
+                        tier, division, error = item
+                        self.errors[(tier, division)] = error
+                        if self._on_error is not None:
+                            self._on_error(tier, division, error)
+                    else:
+                        yield item
+            finally:
+                stop.set()
+
+    def run(self, region: Region, queue: Queue, database: Database, batch_size: int=5000,
+            tiers: Iterable[Tier]=Tier, divisions: Iterable[Division]=Division) -> int:
+        count = 0
+        batch = []
+        for entries in self.iter_entries(region, queue, tiers, divisions):
+            batch.extend(entries)
+            if len(batch) >= batch_size:
+                database.upsert(batch)
+                count += len(batch)
+                batch = []
+
+        if batch:
+            database.upsert(batch)
+            count += len(batch)
+        return count
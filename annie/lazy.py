@@ -0,0 +1,79 @@
+from .dto import MatchInfoDto
+
+from concurrent.futures import Executor, Future
+from threading import Lock
+from typing import Callable, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import instance_state, set_committed_value
+
+
+TIMELINE_ATTRIBUTES = ('timeline_participants', 'timeline_events')
+
+
+class DeferredTimeline:
+    # `stored` is tried first in the accessing thread (e.g. the database), `load` fetches and parses the timeline;
+    # a prefetch only runs `load`, ahead of time on an executor
+    def __init__(self, load: Callable[[], Dict], stored: Callable[[], Optional[Dict]]=None):
+        self._load = load
+        self._stored = stored
+        self._future: Optional[Future] = None
+        self._value: Optional[Dict] = None
+        self._lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
+
+    def prefetch(self, executor: Executor):
+        with self._lock:
+            if self._value is None and self._future is None:
+                self._future = executor.submit(self._load)
+
+    def result(self) -> Dict:
+        with self._lock:
+            if self._value is None:
+                if self._future is not None:
+                    self._value = self._future.result()
+                else:
+                    self._value = (self._stored() if self._stored is not None else None) or self._load()
+            return self._value
+
+
+def defer_timeline(match: MatchInfoDto, timeline: DeferredTimeline) -> MatchInfoDto:
+    # registers the handle as the loader of both timeline relationships: the first access to either attribute
+    # resolves it and sets both as committed values, untouched matches never pay for the timeline
+    match._deferred_timeline = timeline
+    _register(instance_state(match), timeline)
+    return match
+
+
+def _register(state, timeline: DeferredTimeline):
+    # InstanceState.callables is the per-instance loader table SQLAlchemy 1.4 consults before a relationship's
+    # own loader; it is internal api, so the dependency is pinned to the 1.4 releases this was tested with
+    def loader(state, passive):
+        value = timeline.result()
+        set_committed_value(state.obj(), 'timeline_events', value['events'])
+        return value['participants']
+
+    def events_loader(state, passive):
+        value = timeline.result()
+        set_committed_value(state.obj(), 'timeline_participants', value['participants'])
+        return value['events']
+
+    state.callables = dict(state.callables)
+    for name, callable_ in zip(TIMELINE_ATTRIBUTES, (loader, events_loader)):
+        if name in state.dict and state.key is not None:
+            continue
+        state.dict.pop(name, None)
+        state.committed_state.pop(name, None)
+        state.callables[name] = callable_
+
+
+@event.listens_for(MatchInfoDto, 'expire')
+@event.listens_for(MatchInfoDto, 'refresh')
+def _restore(target: MatchInfoDto, *args):
+    # expiry on commit and the refresh that follows drop instance loaders in favour of the relationship's
+    # own, which would read an empty timeline from the database; a deferred timeline is registered again
+    timeline = target.__dict__.get('_deferred_timeline')
+    if timeline is not None:
+        _register(instance_state(target), timeline)
@@ -0,0 +1,271 @@
+from .static import Region
+
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Dict, List, Tuple
+import socket
+
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Instrumentation:
+    # callback surface of the hot paths; every hook is a no-op, override the ones you need
+    def on_request(self, region: Region, endpoint: str, status_code: int, elapsed: float):
+        pass
+
+    def on_bytes(self, region: Region, endpoint: str, size: int):
+        pass
+
+    def on_rate_limit_wait(self, region: Region, endpoint: str, waited: float):
+        pass
+
+    def on_cache(self, cache: str, hit: bool):
+        pass
+
+    def on_parse(self, endpoint: str, elapsed: float):
+        pass
+
+    def on_build(self, kind: str, elapsed: float):
+        pass
+
+    def on_database(self, operation: str, elapsed: float, rows: int=0):
+        pass
+
+
+class CompositeInstrumentation(Instrumentation):
+    def __init__(self, instrumentations: List[Instrumentation]):
+        self._instrumentations = list(instrumentations)
+
+    def on_request(self, *args):
+        for n in self._instrumentations:
+            n.on_request(*args)
+
+    def on_bytes(self, *args):
+        for n in self._instrumentations:
+            n.on_bytes(*args)
+
+    def on_rate_limit_wait(self, *args):
+        for n in self._instrumentations:
+            n.on_rate_limit_wait(*args)
+
+    def on_cache(self, *args):
+        for n in self._instrumentations:
+            n.on_cache(*args)
+
+    def on_parse(self, *args):
+        for n in self._instrumentations:
+            n.on_parse(*args)
+
+    def on_build(self, *args):
+        for n in self._instrumentations:
+            n.on_build(*args)
+
+    def on_database(self, *args):
+        for n in self._instrumentations:
+            n.on_database(*args)
+
+
+def instrumentation_of(value: Instrumentation | List[Instrumentation] | None) -> Instrumentation:
+    if value is None:
+        return Instrumentation()
+    if isinstance(value, Instrumentation):
+        return value
+    return CompositeInstrumentation(value)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append(('+Inf' if bound == float('inf') else repr(bound), total))
+        return result
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Metrics(Instrumentation):
+    # in-process aggregation of every hook, exported as prometheus text exposition
+    HISTOGRAMS = {
+        'annie_request_seconds': 'latency of riot api requests',
+        'annie_rate_limit_wait_seconds': 'time spent waiting on the rate limiter before a request',
+        'annie_parse_seconds': 'time to decode and snake_case a response body',
+        'annie_build_seconds': 'time to build dtos from a parsed response',
+        'annie_database_seconds': 'duration of database flushes, commits and bulk writes',
+    }
+    COUNTERS = {
+        'annie_requests_total': 'riot api responses by status code',
+        'annie_received_bytes_total': 'response bytes received from the riot api',
+        'annie_cache_lookups_total': 'cache lookups by result',
+        'annie_database_rows_total': 'rows written by bulk database operations',
+    }
+
+    def __init__(self, buckets: Tuple[float, ...]=LATENCY_BUCKETS):
+        self._buckets = buckets
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {n: {} for n in self.HISTOGRAMS}
+        self._counters: Dict[str, Dict[Labels, float]] = {n: {} for n in self.COUNTERS}
+        self._lock = Lock()
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(labels.items())
+        with self._lock:
+            histogram = self._histograms[name].get(key)
+            if histogram is None:
+                histogram = self._histograms[name][key] = Histogram(self._buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float=1, **labels):
+        key = tuple(labels.items())
+        with self._lock:
+            counters = self._counters[name]
+            counters[key] = counters.get(key, 0) + value
+
+    def on_request(self, region: Region, endpoint: str, status_code: int, elapsed: float):
+        self.observe('annie_request_seconds', elapsed, region=region.name, endpoint=endpoint)
+        self.increment('annie_requests_total', region=region.name, endpoint=endpoint, status=str(status_code))
+
+    def on_bytes(self, region: Region, endpoint: str, size: int):
+        self.increment('annie_received_bytes_total', size, region=region.name, endpoint=endpoint)
+
+    def on_rate_limit_wait(self, region: Region, endpoint: str, waited: float):
+        self.observe('annie_rate_limit_wait_seconds', waited, region=region.name, endpoint=endpoint)
+
+    def on_cache(self, cache: str, hit: bool):
+        self.increment('annie_cache_lookups_total', cache=cache, result='hit' if hit else 'miss')
+
+    def on_parse(self, endpoint: str, elapsed: float):
+        self.observe('annie_parse_seconds', elapsed, endpoint=endpoint)
+
+    def on_build(self, kind: str, elapsed: float):
+        self.observe('annie_build_seconds', elapsed, kind=kind)
+
+    def on_database(self, operation: str, elapsed: float, rows: int=0):
+        self.observe('annie_database_seconds', elapsed, operation=operation)
+        if rows:
+            self.increment('annie_database_rows_total', rows, operation=operation)
+
+    def cache_hit_ratio(self) -> Dict[str, float]:
+        lookups = {}
+        with self._lock:
+            for labels, value in self._counters['annie_cache_lookups_total'].items():
+                labels = dict(labels)
+                hits, total = lookups.get(labels['cache'], (0, 0))
+                lookups[labels['cache']] = (hits + (value if labels['result'] == 'hit' else 0), total + value)
+        return {k: hits / total for k, (hits, total) in lookups.items() if total}
+
+    def reset(self):
+        with self._lock:
+            for n in self._histograms.values():
+                n.clear()
+            for n in self._counters.values():
+                n.clear()
+
+    @staticmethod
+    def _format(labels: Labels, **extra) -> str:
+        pairs = [*labels, *extra.items()]
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, description in self.COUNTERS.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in self._counters[name].items():
+                    lines.append(f'{name}{self._format(labels)} {value}')
+
+            for name, description in self.HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, histogram in self._histograms[name].items():
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{self._format(labels, le=bound)} {count}')
+                    lines.append(f'{name}_sum{self._format(labels)} {histogram.sum}')
+                    lines.append(f'{name}_count{self._format(labels)} {histogram.count}')
+
+        lines.append('# HELP annie_cache_hit_ratio share of cache lookups answered from the cache')
+        lines.append('# TYPE annie_cache_hit_ratio gauge')
+        for cache, ratio in self.cache_hit_ratio().items():
+            lines.append(f'annie_cache_hit_ratio{{cache="{cache}"}} {ratio}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int=9464, host: str='') -> ThreadingHTTPServer:
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class StatsdInstrumentation(Instrumentation):
+    # fire-and-forget udp datagrams in the plain statsd line format; a lost packet is a lost sample
+    def __init__(self, host: str='localhost', port: int=8125, prefix: str='annie'):
+        self._address = (host, port)
+        self._prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _send(self, line: str):
+        try:
+            self._socket.sendto(f'{self._prefix}.{line}'.encode(), self._address)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _name(value: str) -> str:
+        return value.replace('.', '_')
+
+    def on_request(self, region: Region, endpoint: str, status_code: int, elapsed: float):
+        self._send(f'request.{region.name}.{self._name(endpoint)}:{elapsed * 1000:.3f}|ms')
+        self._send(f'status.{region.name}.{self._name(endpoint)}.{status_code}:1|c')
+
+    def on_bytes(self, region: Region, endpoint: str, size: int):
+        self._send(f'bytes.{region.name}.{self._name(endpoint)}:{size}|c')
+
+    def on_rate_limit_wait(self, region: Region, endpoint: str, waited: float):
+        self._send(f'rate_limit_wait.{region.name}.{self._name(endpoint)}:{waited * 1000:.3f}|ms')
+
+    def on_cache(self, cache: str, hit: bool):
+        self._send(f'cache.{self._name(cache)}.{"hit" if hit else "miss"}:1|c')
+
+    def on_parse(self, endpoint: str, elapsed: float):
+        self._send(f'parse.{self._name(endpoint)}:{elapsed * 1000:.3f}|ms')
+
+    def on_build(self, kind: str, elapsed: float):
+        self._send(f'build.{kind}:{elapsed * 1000:.3f}|ms')
+
+    def on_database(self, operation: str, elapsed: float, rows: int=0):
+        self._send(f'database.{operation}:{elapsed * 1000:.3f}|ms')
+        if rows:
+            self._send(f'database.{operation}.rows:{rows}|c')
+
+    def close(self):
+        self._socket.close()
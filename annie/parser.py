@@ -0,0 +1,83 @@
+from .api import LeagueApi
+from .database import Database
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Tuple
+import json
+import os
+
+
+Payload = bytes | str | Dict
+Rows = Dict[str, List[tuple]]
+
+
+def _load(payload: Payload) -> Dict:
+    if isinstance(payload, (bytes, str)):
+        payload = json.loads(payload)
+    return LeagueApi.transform_to_snake_case(payload)
+
+
+def parse_match(match: Payload, timeline: Payload=None) -> Rows:
+    timeline = LeagueApi._create_timeline_dtos(_load(timeline)) if timeline is not None else None
+    return Database.rows_of(LeagueApi._create_match_dto(_load(match), timeline))
+
+
+def parse_timeline(timeline: Payload) -> Rows:
+    timeline = LeagueApi._create_timeline_dtos(_load(timeline))
+    return Database.rows_of(timeline['participants'] + timeline['events'])
+
+
+def _parse_matches(items: List[Tuple[Payload, Payload]]) -> List[Rows]:
+    return [parse_match(*n) for n in items]
+
+
+def _parse_timelines(items: List[Payload]) -> List[Rows]:
+    return [parse_timeline(n) for n in items]
+
+
+class ParserPool:
+    # rows come back as plain tuples in table column order, ready for Database.upsert_rows,
+    # so only compact data crosses the process boundary; at most window chunks are in flight,
+    # a long payload stream is read as fast as it is parsed instead of all at once
+    def __init__(self, processes: int=None, chunksize: int=4, window: int=None):
+        processes = processes or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=processes)
+        self._chunksize = chunksize
+        self._window = window or processes * 2
+
+    def parse_matches(self, payloads: Iterable[Tuple[Payload, Payload]]) -> Iterator[Rows]:
+        return self._submit(_parse_matches, payloads)
+
+    def parse_timelines(self, payloads: Iterable[Payload]) -> Iterator[Rows]:
+        return self._submit(_parse_timelines, payloads)
+
+    def _submit(self, func: Callable[[List], List[Rows]], payloads: Iterable) -> Iterator[Rows]:
+        payloads = iter(payloads)
+        running: Deque[Future] = deque()
+        while True:
+            chunk = list(islice(payloads, self._chunksize))
+            if chunk:
+                running.append(self._executor.submit(func, chunk))
+            if running and (not chunk or len(running) >= self._window):
+                yield from running.popleft().result()
+            elif not chunk:
+                break
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def merge_rows(rows: Iterable[Rows]) -> Rows:
+    result: Rows = {}
+    for n in rows:
+        for table, values in n.items():
+            result.setdefault(table, []).extend(values)
+    return result
@@ -0,0 +1,182 @@
+from .database import Database
+from .dto import MatchInfoDto, MatchParticipantFramesDto, MatchEventDto
+from .record import Record
+
+from datetime import datetime
+from threading import Lock
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import MetaData, Table, Column, inspect, select
+from sqlalchemy.engine import Engine, Row
+import io
+
+
+TIMELINE_TABLES = (MatchParticipantFramesDto.__table__, MatchEventDto.__table__)
+Rows = Dict[str, List[tuple]]
+# the order of the api response, frame by frame
+TIMELINE_ORDER = {
+    MatchParticipantFramesDto.__tablename__: ('timestamp', 'participant_id'),
+    MatchEventDto.__tablename__: ('timeframe', 'sequence'),
+}
+
+
+def timeline_partitions(engine: Engine) -> List[str]:
+    prefixes = tuple(f'{n.name}_' for n in TIMELINE_TABLES)
+    return sorted(n for n in inspect(engine).get_table_names() if n.startswith(prefixes))
+
+
+class TimelineStore:
+    # timeline rows go straight to per-partition tables (<table>_<yyyy_mm> or <table>_p<major>_<minor>),
+    # bypassing the session: COPY on postgresql/psycopg2, chunked executemany elsewhere.
+    # partitions are append-only, a game already present in its partition is skipped.
+    # the store registers itself on the database, so Database.timeline reads the partitions too
+    def __init__(self, database: Database, partition: str='month', chunk_size: int=50_000):
+        if partition not in ('month', 'patch', None):
+            raise ValueError(f"unknown partition '{partition}'")
+
+        self._database = database
+        database.timeline_store = self
+        self._partition = partition
+        self._chunk_size = chunk_size
+        self._metadata = MetaData()
+        self._tables: Dict[str, Table] = {}
+        self._lock = Lock()
+
+    def suffix(self, game_creation: datetime, game_version: str) -> Optional[str]:
+        if self._partition == 'month':
+            return f'{game_creation.year}_{game_creation.month:02d}'
+        if self._partition == 'patch':
+            return 'p' + '_'.join(game_version.split('.')[:2])
+        return None
+
+    def table(self, base: Table, suffix: Optional[str]) -> Table:
+        name = f'{base.name}_{suffix}' if suffix else base.name
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+
+        with self._lock:
+            if name not in self._tables:
+                table = self._define(base, suffix)
+                table.create(self._database.engine, checkfirst=True)
+                self._tables[name] = table
+            return self._tables[name]
+
+    def _existing_table(self, base: Table, suffix: Optional[str]) -> Optional[Table]:
+        # like table, but never issues DDL: a partition nothing was written to yet is None
+        name = f'{base.name}_{suffix}' if suffix else base.name
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+
+        if not inspect(self._database.engine).has_table(name):
+            return None
+        with self._lock:
+            return self._tables.setdefault(name, self._define(base, suffix))
+
+    def _define(self, base: Table, suffix: Optional[str]) -> Table:
+        if suffix is None:
+            return base
+        name = f'{base.name}_{suffix}'
+        if name in self._metadata.tables:
+            return self._metadata.tables[name]
+        # no foreign key on partitions, the matches table may live in another schema or database
+        return Table(name, self._metadata, *[
+            Column(n.name, n.type, primary_key=n.primary_key) for n in base.columns
+        ])
+
+    def partitions(self) -> List[str]:
+        return timeline_partitions(self._database.engine)
+
+    def write(self, matches: Iterable[MatchInfoDto | Record]) -> int:
+        nodes = []
+        suffixes: Dict[int, Optional[str]] = {}
+        for match in matches:
+            suffixes[match.game_id] = self.suffix(match.game_creation, match.game_version)
+            nodes.extend(match.timeline_participants)
+            nodes.extend(match.timeline_events)
+        return self.write_rows(Database.rows_of(nodes), suffixes)
+
+    def write_rows(self, rows: Rows, suffixes: Dict[int, Optional[str]]) -> int:
+        written = 0
+        for base in TIMELINE_TABLES:
+            grouped: Dict[Optional[str], List[tuple]] = {}
+            game_id = [n.name for n in base.columns].index('game_id')
+            for row in rows.get(base.name, ()):
+                grouped.setdefault(suffixes[row[game_id]], []).append(row)
+
+            for suffix, values in grouped.items():
+                table = self.table(base, suffix)
+                stored = self._stored_game_ids(table, {n[game_id] for n in values})
+                if stored:
+                    values = [n for n in values if n[game_id] not in stored]
+                written += self._append(table, values)
+        return written
+
+    def read(self, game_id: int) -> Optional[Dict[str, List[Row]]]:
+        match = self._database.session.execute(
+            select(MatchInfoDto.game_creation, MatchInfoDto.game_version).where(MatchInfoDto.game_id == game_id)
+        ).first()
+        if match is None:
+            return None
+
+        suffix = self.suffix(match.game_creation, match.game_version)
+        result = {}
+        with self._database.engine.connect() as connection:
+            for base, key in zip(TIMELINE_TABLES, ('participants', 'events')):
+                table = self._existing_table(base, suffix)
+                if table is None:
+                    result[key] = []
+                    continue
+                order = [table.c[n] for n in TIMELINE_ORDER[base.name]]
+                result[key] = connection.execute(
+                    select(table).where(table.c.game_id == game_id).order_by(*order)
+                ).all()
+        return result
+
+    def _stored_game_ids(self, table: Table, game_ids: set) -> set:
+        with self._database.engine.connect() as connection:
+            statement = select(table.c.game_id).distinct().where(table.c.game_id.in_(game_ids))
+            return set(connection.execute(statement).scalars())
+
+    def _append(self, table: Table, rows: List[tuple]) -> int:
+        if not rows:
+            return 0
+
+        engine = self._database.engine
+        started = perf_counter()
+        with engine.begin() as connection:
+            if engine.dialect.name == 'postgresql' and engine.dialect.driver == 'psycopg2':
+                self._copy(connection, table, rows)
+            else:
+                columns = [n.name for n in table.columns]
+                statement = table.insert()
+                for n in range(0, len(rows), self._chunk_size):
+                    connection.execute(statement, [dict(zip(columns, row)) for row in rows[n:n+self._chunk_size]])
+        self._database.instrumentation.on_database(f'append.{table.name}', perf_counter() - started, len(rows))
+        return len(rows)
+
+    def _copy(self, connection, table: Table, rows: List[tuple]):
+        columns = ', '.join(n.name for n in table.columns)
+        cursor = connection.connection.cursor()
+        try:
+            for n in range(0, len(rows), self._chunk_size):
+                buffer = io.StringIO()
+                for row in rows[n:n+self._chunk_size]:
+                    buffer.write('\t'.join(copy_text(value) for value in row))
+                    buffer.write('\n')
+                buffer.seek(0)
+                cursor.copy_expert(f'COPY {table.name} ({columns}) FROM STDIN', buffer)
+        finally:
+            cursor.close()
+
+
+def copy_text(value) -> str:
+    # text format of COPY: \N is NULL and never collides with a value, unlike an empty csv field
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, str):
+        return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return str(value)
@@ -0,0 +1,137 @@
+from collections import deque
+from threading import Lock
+from time import monotonic, sleep
+from typing import Deque, Dict, List, Mapping, Tuple
+from .static import Region
+
+
+class RateLimitBucket:
+    # sliding log instead of a refilling bucket: riot counts in fixed windows, a refill
+    # rate of limit/interval would still allow up to twice the limit inside one window
+    def __init__(self, limit: int, interval: float):
+        self.limit = limit
+        self.interval = interval
+        self._stamps: Deque[float] = deque()
+
+    def _expire(self, now: float):
+        while self._stamps and self._stamps[0] <= now - self.interval:
+            self._stamps.popleft()
+
+    def wait_time(self, now: float) -> float:
+        self._expire(now)
+        if len(self._stamps) < self.limit:
+            return 0.0
+        return self._stamps[len(self._stamps) - self.limit] + self.interval - now
+
+    def headroom(self, now: float) -> float:
+        self._expire(now)
+        return (self.limit - len(self._stamps)) / self.limit
+
+    def consume(self, now: float):
+        self._stamps.append(now)
+
+    def sync(self, count: int, now: float):
+        self._expire(now)
+        while len(self._stamps) < count:
+            self._stamps.append(now)
+
+
+class RateLimitScope:
+    def __init__(self):
+        self.buckets: Dict[Tuple[int, float], RateLimitBucket] = {}
+        self.blocked_until = 0.0
+
+    def wait_time(self, now: float) -> float:
+        wait = max(0.0, self.blocked_until - now)
+        for bucket in self.buckets.values():
+            wait = max(wait, bucket.wait_time(now))
+        return wait
+
+    def headroom(self, now: float) -> float:
+        if self.blocked_until > now:
+            return 0.0
+        return min([n.headroom(now) for n in self.buckets.values()], default=1.0)
+
+    def consume(self, now: float):
+        for bucket in self.buckets.values():
+            bucket.consume(now)
+
+    def update(self, limits: str, counts: str, now: float):
+        parsed = RateLimiter.parse_header(limits)
+        if parsed:
+            for key in list(self.buckets):
+                if key not in parsed:
+                    del self.buckets[key]
+            for limit, interval in parsed:
+                if (limit, interval) not in self.buckets:
+                    self.buckets[(limit, interval)] = RateLimitBucket(limit, interval)
+
+        for count, interval in RateLimiter.parse_header(counts):
+            for (_, bucket_interval), bucket in self.buckets.items():
+                if bucket_interval == interval:
+                    bucket.sync(count, now)
+
+
+class RateLimiter:
+    def __init__(self, margin: float=0.05, default_retry_after: float=1.0):
+        self._margin = margin
+        self._default_retry_after = default_retry_after
+        self._scopes: Dict[Tuple, RateLimitScope] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def parse_header(value: str) -> List[Tuple[int, float]]:
+        if not value:
+            return []
+        result = []
+        for pair in value.split(','):
+            amount, interval = pair.split(':')
+            result.append((int(amount), float(interval)))
+        return result
+
+    def _scope(self, *key) -> RateLimitScope:
+        scope = self._scopes.get(key)
+        if scope is None:
+            scope = self._scopes[key] = RateLimitScope()
+        return scope
+
+    def _scopes_for(self, region: Region, endpoint: str, api_key: str=None) -> Tuple[RateLimitScope, RateLimitScope]:
+        return self._scope(api_key, region, 'application'), self._scope(api_key, region, 'method', endpoint)
+
+    def acquire(self, region: Region, endpoint: str, api_key: str=None) -> float:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = monotonic()
+                scopes = self._scopes_for(region, endpoint, api_key)
+                wait = max(n.wait_time(now) for n in scopes)
+                if wait <= 0:
+                    for scope in scopes:
+                        scope.consume(now)
+                    return waited
+            wait += self._margin
+            sleep(wait)
+            waited += wait
+
+    def headroom(self, region: Region, endpoint: str, api_key: str=None) -> float:
+        with self._lock:
+            now = monotonic()
+            return min(n.headroom(now) for n in self._scopes_for(region, endpoint, api_key))
+
+    def update(self, region: Region, endpoint: str, headers: Mapping[str, str], status_code: int,
+               api_key: str=None) -> float:
+        with self._lock:
+            now = monotonic()
+            application, method = self._scopes_for(region, endpoint, api_key)
+            application.update(headers.get('X-App-Rate-Limit'), headers.get('X-App-Rate-Limit-Count'), now)
+            method.update(headers.get('X-Method-Rate-Limit'), headers.get('X-Method-Rate-Limit-Count'), now)
+
+            if status_code != 429:
+                return 0.0
+
+            retry_after = float(headers.get('Retry-After', self._default_retry_after))
+            if headers.get('X-Rate-Limit-Type') == 'application':
+                application.blocked_until = max(application.blocked_until, now + retry_after)
+            else:
+                method.blocked_until = max(method.blocked_until, now + retry_after)
+            return retry_after
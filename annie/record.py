@@ -0,0 +1,67 @@
+from .dto import Dto, walk
+
+from dataclasses import MISSING, field, fields, make_dataclass
+from sqlalchemy import inspect
+from typing import Dict, Iterable, List
+
+
+RECORD_TYPES: Dict[type, type] = {}
+
+
+class Record:
+    # plain __slots__ twin of a mapped dto: same fields, no orm instrumentation or instance __dict__
+    __slots__ = ()
+    __dto__: type = None
+    __relationships__: tuple = ()
+
+    @classmethod
+    def relationships(cls) -> tuple:
+        return cls.__relationships__
+
+    def to_dto(self) -> List['Record']:
+        return list(walk(self))
+
+    def to_mapped(self) -> Dto:
+        values = {}
+        for n in fields(self):
+            value = getattr(self, n.name)
+            if n.name in self.__relationships__:
+                value = [element.to_mapped() for element in value]
+            values[n.name] = value
+        return self.__dto__(**values)
+
+
+def record_type(cls: type) -> type:
+    record = RECORD_TYPES.get(cls)
+    if record is not None:
+        return record
+
+    relationships = tuple(inspect(cls).relationships.keys())
+    definitions = []
+    for n in fields(cls):
+        if n.name in relationships:
+            definitions.append((n.name, n.type, field(default_factory=list)))
+        elif n.default is not MISSING:
+            definitions.append((n.name, n.type, field(default=n.default)))
+        else:
+            definitions.append((n.name, n.type))
+
+    record = make_dataclass(
+        cls.__name__.replace('Dto', 'Record'),
+        definitions,
+        bases=(Record,),
+        namespace={'__dto__': cls, '__relationships__': relationships, '__table__': cls.__table__},
+        slots=True
+    )
+    RECORD_TYPES[cls] = record
+    return record
+
+
+def dto_type(cls: type, records: bool=False) -> type:
+    return record_type(cls) if records else cls
+
+
+def to_mapped(records: Iterable[Record] | Record) -> List[Dto] | Dto:
+    if isinstance(records, Record):
+        return records.to_mapped()
+    return [n.to_mapped() for n in records]
@@ -0,0 +1,107 @@
+from .api import LeagueApi
+from .database import Database
+from .dto import SummonerDto, LeagueEntryDto
+from .exception import ApiException
+from .static import Region
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+from requests import RequestException
+from sqlalchemy import select
+
+
+T = TypeVar('T')
+
+
+class SummonerResolver:
+    # answers from the database first, then from the api's method caches, and only requests what is left;
+    # fetched results are written back, so recurring players of overlapping lobbies cost one request;
+    # a failing key is left out and reported in errors, the partial result is still returned and stored
+    def __init__(self, api: LeagueApi, database: Database=None, workers: int=8, store: bool=True,
+                 chunk_size: int=500):
+        self._api = api
+        self._database = database
+        self._workers = workers
+        self._store = store
+        self._chunk_size = chunk_size
+        self.errors: Dict[str, str] = {}
+
+    def summoners(self, region: Region, puuids: Iterable[str]=None, summoner_ids: Iterable[str]=None,
+                  refresh: bool=False) -> Dict[str, SummonerDto]:
+        if (puuids is None) == (summoner_ids is None):
+            raise ValueError('either puuids or summoner_ids is required')
+
+        by_puuid = puuids is not None
+        keys = list(dict.fromkeys(puuids if by_puuid else summoner_ids))
+        column = SummonerDto.puuid if by_puuid else SummonerDto.summoner_id
+
+        result = {}
+        if not refresh:
+            for summoner in self._stored(SummonerDto, region, column, keys):
+                result[summoner.puuid if by_puuid else summoner.summoner_id] = summoner
+
+        missing = [n for n in keys if n not in result]
+        if by_puuid:
+            fetched = self._fetch(missing, lambda n: self._api.get_summoner(region, puuid=n))
+        else:
+            fetched = self._fetch(missing, lambda n: self._api.get_summoner(region, summoner_id=n))
+
+        if fetched and self._store and self._database is not None:
+            self._database.upsert(list(fetched.values()))
+
+        result.update(fetched)
+        return result
+
+    def league_entries(self, region: Region, summoner_ids: Iterable[str],
+                       refresh: bool=False) -> Dict[str, List[LeagueEntryDto]]:
+        # unranked players have no stored rows and are requested again, the method cache still absorbs repeats
+        keys = list(dict.fromkeys(summoner_ids))
+
+        result: Dict[str, List[LeagueEntryDto]] = {}
+        if not refresh:
+            for entry in self._stored(LeagueEntryDto, region, LeagueEntryDto.summoner_id, keys):
+                result.setdefault(entry.summoner_id, []).append(entry)
+
+        missing = [n for n in keys if n not in result]
+        fetched = self._fetch(missing, lambda n: self._api.get_league_entries(region, n))
+
+        entries = [n for values in fetched.values() for n in values]
+        if entries and self._store and self._database is not None:
+            self._database.upsert(entries)
+
+        result.update(fetched)
+        return result
+
+    def _stored(self, dto: type, region: Region, column, keys: List[str]) -> List:
+        if self._database is None:
+            return []
+
+        result = []
+        for n in range(0, len(keys), self._chunk_size):
+            statement = select(dto).where(dto.region == region.name, column.in_(keys[n:n+self._chunk_size]))
+            result.extend(self._database.session.execute(statement).scalars())
+        return result
+
+    def _fetch(self, keys: List[str], func: Callable[[str], T]) -> Dict[str, T]:
+        self.errors = {}
+
+        def call(key: str) -> Optional[T]:
+            try:
+                return func(key)
+            except ApiException as e:
+                if e.status_code != 404:
+                    self.errors[key] = f'{e.status_code}: {e.message}'
+            except (ValueError, KeyError, TypeError) as e:
+                # checked before RequestException, requests' json errors are both
+                self.errors[key] = f'parse failed: {e!r}'
+            except RequestException as e:
+                self.errors[key] = f'request failed: {e}'
+            return None
+
+        if not keys:
+            return {}
+
+        # every call still passes the shared rate limiter, the pool only bounds how many wait at once
+        with ThreadPoolExecutor(max_workers=min(self._workers, len(keys))) as executor:
+            values = list(executor.map(call, keys))
+        return {k: v for k, v in zip(keys, values) if v is not None}
@@ -1,3 +1,4 @@
+import re
 from enum import Enum
 
 
@@ -13,6 +14,29 @@ class Queue(Enum):
     DRAFT = 'DRAFT'
 
 
+class Tier(Enum):
+    IRON = 'IRON'
+    BRONZE = 'BRONZE'
+    SILVER = 'SILVER'
+    GOLD = 'GOLD'
+    PLATINUM = 'PLATINUM'
+    DIAMOND = 'DIAMOND'
+    MASTER = 'MASTER'
+    GRANDMASTER = 'GRANDMASTER'
+    CHALLENGER = 'CHALLENGER'
+
+    @property
+    def is_apex(self) -> bool:
+        return self in (Tier.MASTER, Tier.GRANDMASTER, Tier.CHALLENGER)
+
+
+class Division(Enum):
+    I = 'I'
+    II = 'II'
+    III = 'III'
+    IV = 'IV'
+
+
 class SummonerV4:
     @staticmethod
     def by_name(name: str) -> str:
@@ -49,7 +73,9 @@ class LeagueV4:
         return f'/lol/league/v4/entries/by-summoner/{summoner_id}'
 
     @staticmethod
-    def entries(queue: Queue, tier: str, division: str) -> str:
+    def entries(queue: Queue, tier: Tier | str, division: Division | str) -> str:
+        tier = tier.value if isinstance(tier, Tier) else tier
+        division = division.value if isinstance(division, Division) else division
         return f'/lol/league/v4/entries/{queue.value}/{tier}/{division}'
 
     @staticmethod
@@ -68,4 +94,27 @@ class MatchV5:
 
     @staticmethod
     def timeline(match_id: str) -> str:
-        return f'/lol/match/v5/matches/{match_id}/timeline'
\ No newline at end of file
+        return f'/lol/match/v5/matches/{match_id}/timeline'
+
+ENDPOINTS = [
+    (re.compile(r'^/lol/summoner/v4/summoners/by-name/'), 'SummonerV4.by_name'),
+    (re.compile(r'^/lol/summoner/v4/summoners/by-account/'), 'SummonerV4.by_account_id'),
+    (re.compile(r'^/lol/summoner/v4/summoners/by-puuid/'), 'SummonerV4.by_puuid'),
+    (re.compile(r'^/lol/summoner/v4/summoners/'), 'SummonerV4.by_id'),
+    (re.compile(r'^/lol/league/v4/challengerleagues/'), 'LeagueV4.challenger_league_by_queue'),
+    (re.compile(r'^/lol/league/v4/grandmasterleagues/'), 'LeagueV4.grandmaster_league_by_queue'),
+    (re.compile(r'^/lol/league/v4/masterleagues/'), 'LeagueV4.master_league_by_queue'),
+    (re.compile(r'^/lol/league/v4/entries/by-summoner/'), 'LeagueV4.entries_by_summoner_id'),
+    (re.compile(r'^/lol/league/v4/entries/'), 'LeagueV4.entries'),
+    (re.compile(r'^/lol/league/v4/leagues/'), 'LeagueV4.league_by_id'),
+    (re.compile(r'^/lol/match/v5/matches/by-puuid/'), 'MatchV5.match_history_by_puuid'),
+    (re.compile(r'^/lol/match/v5/matches/[^/]+/timeline$'), 'MatchV5.timeline'),
+    (re.compile(r'^/lol/match/v5/matches/'), 'MatchV5.match'),
+]
+
+
+def endpoint_of(method_name: str) -> str:
+    for pattern, name in ENDPOINTS:
+        if pattern.match(method_name):
+            return name
+    return method_name
@@ -0,0 +1,77 @@
+from json import JSONDecoder, JSONDecodeError
+from typing import Iterable, Iterator
+import codecs
+import re
+
+
+WHITESPACE = ' \t\r\n,'
+DELIMITERS = WHITESPACE + ']'
+SELF_DELIMITED = '{["'
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str, compact_at: int=64*1024) -> Iterator:
+    # yields the objects of the first array stored under `key` while the body is still arriving;
+    # only the current item and the unread tail of the last chunk are held in memory
+    decoder = JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    marker = f'"{key}"'
+    # a string value equal to the key is not followed by a colon
+    opening = re.compile(re.escape(marker) + r'\s*:\s*\[')
+    partial = re.compile(r'\s*(:\s*)?')
+    buffer = ''
+
+    def fill() -> bool:
+        nonlocal buffer
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer += text.decode(chunk)
+        return True
+
+    while True:
+        match = opening.search(buffer)
+        if match is not None:
+            buffer = buffer[match.end():]
+            break
+
+        index = buffer.rfind(marker)
+        if index >= 0 and partial.fullmatch(buffer, index + len(marker)):
+            buffer = buffer[index:]
+        else:
+            buffer = buffer[-len(marker):]
+        if not fill():
+            raise ValueError(f'no array "{key}" found in response')
+
+    position = 0
+    while True:
+        while position < len(buffer) and buffer[position] in WHITESPACE:
+            position += 1
+
+        if position == len(buffer):
+            buffer, position = '', 0
+            if not fill():
+                raise ValueError(f'array "{key}" is truncated')
+            continue
+
+        if buffer[position] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except JSONDecodeError:
+            buffer, position = buffer[position:], 0
+            if not fill():
+                raise
+            continue
+
+        # a number is only complete once the character after it has arrived, '12' may still become '123'
+        if buffer[position] not in SELF_DELIMITED and (end == len(buffer) or buffer[end] not in DELIMITERS):
+            buffer, position = buffer[position:], 0
+            if fill():
+                continue
+
+        yield item
+        position = end
+        if position > compact_at:
+            buffer, position = buffer[position:], 0
@@ -0,0 +1,83 @@
+from .api import LeagueApi
+from .database import Database
+from .dto import MatchInfoDto, MatchHistoryWatermarkDto
+from .ingest import IngestPipeline, IngestReport
+from .static import Region, Queue
+from .utility import game_id_of
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select
+
+
+class MatchHistorySync:
+    def __init__(self, api: LeagueApi, database: Database, pipeline: IngestPipeline=None, page_size: int=100):
+        self._api = api
+        self._database = database
+        self._pipeline = pipeline if pipeline is not None else IngestPipeline(api, database)
+        self._page_size = page_size
+
+    @staticmethod
+    def queue_key(queue: Queue=None) -> str:
+        return '' if queue is None else queue.name
+
+    def watermark(self, region: Region, puuid: str, queue: Queue=None) -> Optional[MatchHistoryWatermarkDto]:
+        return self._database.session.get(MatchHistoryWatermarkDto, (region.name, puuid, self.queue_key(queue)))
+
+    def new_match_ids(self, region: Region, puuid: str, queue: Queue=None) -> List[str]:
+        mark = self.watermark(region, puuid, queue)
+        start_time = mark.last_game_end if mark is not None else None
+
+        match_ids = []
+        start = 0
+        while True:
+            page = self._api.get_match_history(region, puuid, start=start, count=self._page_size,
+                                               start_time=start_time, queue=queue)
+            match_ids.extend(n for n in page if mark is None or n != mark.last_match_id)
+            if len(page) < self._page_size:
+                break
+            start += self._page_size
+
+        return match_ids
+
+    def sync(self, region: Region, puuids: Iterable[str], queue: Queue=None) -> IngestReport:
+        history: Dict[str, List[str]] = {}
+        for puuid in puuids:
+            history[puuid] = self.new_match_ids(region, puuid, queue)
+
+        report = self._pipeline.ingest(region, [n for ids in history.values() for n in ids])
+        self.advance(region, history, queue)
+        return report
+
+    def advance(self, region: Region, history: Dict[str, List[str]], queue: Queue=None):
+        # match ids arrive newest first; the watermark only moves over the stored run of
+        # oldest matches, so anything that failed to ingest is requested again next time
+        stored = self._pipeline.stored_game_ids(game_id_of(n) for ids in history.values() for n in ids)
+
+        latest = {}
+        for puuid, match_ids in history.items():
+            for match_id in reversed(match_ids):
+                if game_id_of(match_id) not in stored:
+                    break
+                latest[puuid] = match_id
+
+        if not latest:
+            return
+
+        statement = select(
+            MatchInfoDto.game_id, MatchInfoDto.game_end_timestamp, MatchInfoDto.game_start_timestamp
+        ).where(MatchInfoDto.game_id.in_([game_id_of(n) for n in latest.values()]))
+        ends = {n.game_id: n.game_end_timestamp or n.game_start_timestamp for n in self._database.session.execute(statement)}
+
+        now = datetime.now()
+        self._database.upsert([
+            MatchHistoryWatermarkDto(
+                region=region.name,
+                puuid=puuid,
+                queue=self.queue_key(queue),
+                last_match_id=match_id,
+                last_game_end=ends[game_id_of(match_id)],
+                synced_at=now
+            )
+            for puuid, match_id in latest.items()
+        ])
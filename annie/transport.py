@@ -0,0 +1,52 @@
+from typing import Dict, Tuple, Union
+from threading import Lock
+from requests.adapters import HTTPAdapter
+from .static import Region
+import requests
+
+
+class Transport:
+    def __init__(self, pool_size: int=10, pool_block: bool=True, keep_alive: bool=True,
+                 timeout: Union[float, Tuple[float, float]]=(3.05, 30), max_retries: int=0):
+        self._pool_size = pool_size
+        self._pool_block = pool_block
+        self._keep_alive = keep_alive
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._sessions: Dict[Region, requests.Session] = {}
+        self._lock = Lock()
+
+    def session(self, region: Region) -> requests.Session:
+        session = self._sessions.get(region)
+        if session is not None:
+            return session
+
+        with self._lock:
+            if region not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self._pool_size,
+                    pool_block=self._pool_block,
+                    max_retries=self._max_retries
+                )
+                session.mount(f'https://{region.value}', adapter)
+                session.headers['Origin'] = 'https://developer.riotgames.com'
+                session.headers['Connection'] = 'keep-alive' if self._keep_alive else 'close'
+                self._sessions[region] = session
+            return self._sessions[region]
+
+    def get(self, region: Region, uri: str, headers: Dict[str, str], stream: bool=False) -> requests.Response:
+        return self.session(region).get(uri, headers=headers, timeout=self._timeout, stream=stream)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,4 +1,25 @@
 from tabulate import tabulate
+from typing import Dict
+from re import compile
+
+
+SNAKE_CASE_PATTERN = compile(r'(?<!^)(?=[A-Z])')
+SNAKE_CASE_KEYS: Dict[str, str] = {}
+SNAKE_CASE_KEYS_MAXSIZE = 8192
+
+
+def snake_case(key: str) -> str:
+    try:
+        return SNAKE_CASE_KEYS[key]
+    except KeyError:
+        value = SNAKE_CASE_PATTERN.sub('_', key).lower()
+        if len(SNAKE_CASE_KEYS) < SNAKE_CASE_KEYS_MAXSIZE:
+            SNAKE_CASE_KEYS[key] = value
+        return value
+
+
+def game_id_of(match_id: str) -> int:
+    return int(str(match_id).rsplit('_', 1)[-1])
 
 
 def print_tab(cls) -> None:
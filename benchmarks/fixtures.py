@@ -0,0 +1,173 @@
+from annie.dto import MatchParticipantDto, MatchParticipantFramesDto
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, List
+import random
+import json
+
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+CHAMPION_STATS = [
+    'ability_haste', 'ability_power', 'armor', 'armor_pen', 'armor_pen_percent', 'attack_damage',
+    'attack_speed', 'bonus_armor_pen_percent', 'bonus_magic_pen_percent', 'cc_reduction',
+    'cooldown_reduction', 'health', 'health_max', 'health_regen', 'lifesteal', 'magic_pen',
+    'magic_pen_percent', 'magic_resist', 'movement_speed', 'omnivamp', 'physical_vamp', 'power',
+    'power_max', 'power_regen', 'spell_vamp',
+]
+DAMAGE_STATS = [
+    'magic_damage_done', 'magic_damage_done_to_champions', 'magic_damage_taken', 'physical_damage_done',
+    'physical_damage_done_to_champions', 'physical_damage_taken', 'total_damage_done',
+    'total_damage_done_to_champions', 'total_damage_taken', 'true_damage_done',
+    'true_damage_done_to_champions', 'true_damage_taken',
+]
+# encrypted ids and names in recorded responses, replaced by `anonymise` before a fixture is committed
+PERSONAL = {
+    'puuid': 'puuid', 'summonerId': 'summoner', 'summonerName': 'name', 'riotIdName': 'name',
+    'riotIdGameName': 'name', 'riotIdTagline': 'tag', 'accountId': 'account',
+}
+EVENTS = [
+    ('ITEM_PURCHASED', 'participantId'), ('SKILL_LEVEL_UP', 'participantId'), ('LEVEL_UP', 'participantId'),
+    ('ITEM_DESTROYED', 'participantId'), ('WARD_PLACED', 'creatorId'), ('WARD_KILL', 'killerId'),
+    ('CHAMPION_KILL', 'killerId'), ('BUILDING_KILL', 'killerId'), ('ELITE_MONSTER_KILL', 'killerId'),
+]
+
+
+def camel_case(name: str) -> str:
+    head, *tail = name.split('_')
+    return head + ''.join(n[:1].upper() + n[1:] for n in tail)
+
+
+def _value(name: str, kind, rng: random.Random):
+    if kind in (bool, 'bool'):
+        return rng.random() < 0.5
+    if kind in (str, 'str'):
+        return f'{name}-{rng.randint(0, 99)}'
+    return rng.randint(0, 5000)
+
+
+def match_payload(game_id: int, seed: int=0) -> Dict:
+    rng = random.Random(seed)
+    participants = []
+    columns = [n for n in fields(MatchParticipantDto) if n.name not in ('game_id', 'style_perks', 'stat_perks')]
+    for participant_id in range(1, 11):
+        participant = {camel_case(n.name): _value(n.name, n.type, rng) for n in columns}
+        participant['participantId'] = participant_id
+        participant['teamId'] = 100 if participant_id <= 5 else 200
+        participant['puuid'] = f'puuid-{game_id}-{participant_id}'
+        participant['summonerId'] = f'summoner-{game_id}-{participant_id}'
+        participant['challenges'] = {f'challenge{n}': rng.random() for n in range(100)}
+        participant['perks'] = {
+            'statPerks': {'defense': 5002, 'flex': 5008, 'offense': 5005},
+            'styles': [
+                {'description': 'primaryStyle', 'style': 8100, 'selections': [
+                    {'perk': 8112 + n, 'var1': rng.randint(0, 999), 'var2': 0, 'var3': 0} for n in range(4)
+                ]},
+                {'description': 'subStyle', 'style': 8200, 'selections': [
+                    {'perk': 8226 + n, 'var1': rng.randint(0, 999), 'var2': 0, 'var3': 0} for n in range(2)
+                ]},
+            ]
+        }
+        participants.append(participant)
+
+    teams = []
+    for team_id in (100, 200):
+        teams.append({
+            'teamId': team_id,
+            'win': team_id == 100,
+            'bans': [{'championId': rng.randint(1, 900), 'pickTurn': n} for n in range(1, 6)],
+            'objectives': {n: {'first': rng.random() < 0.5, 'kills': rng.randint(0, 10)}
+                           for n in ('baron', 'champion', 'dragon', 'inhibitor', 'riftHerald', 'tower')},
+        })
+
+    creation = 1650000000000 + game_id
+    return {
+        'metadata': {'dataVersion': '2', 'matchId': f'EUW1_{game_id}', 'participants': [n['puuid'] for n in participants]},
+        'info': {
+            'gameCreation': creation,
+            'gameDuration': 2100,
+            'gameEndTimestamp': creation + 2160000,
+            'gameId': game_id,
+            'gameMode': 'CLASSIC',
+            'gameName': f'teambuilder-match-{game_id}',
+            'gameStartTimestamp': creation + 60000,
+            'gameType': 'MATCHED_GAME',
+            'gameVersion': '12.8.425.3026',
+            'mapId': 11,
+            'participants': participants,
+            'platformId': 'EUW1',
+            'queueId': 420,
+            'teams': teams,
+            'tournamentCode': '',
+        }
+    }
+
+
+def timeline_payload(game_id: int, minutes: int=35, events_per_frame: int=40, seed: int=0) -> Dict:
+    rng = random.Random(seed)
+    other = [n.name for n in fields(MatchParticipantFramesDto)
+             if n.name not in CHAMPION_STATS + DAMAGE_STATS + ['game_id', 'timestamp', 'x', 'y']]
+    frames = []
+    for minute in range(minutes + 1):
+        timestamp = minute * 60000 + (rng.randint(0, 50) if minute else 0)
+        participant_frames = {}
+        for participant_id in range(1, 11):
+            frame = {camel_case(n): rng.randint(0, 5000) for n in other}
+            frame['participantId'] = participant_id
+            frame['championStats'] = {camel_case(n): rng.randint(0, 5000) for n in CHAMPION_STATS}
+            frame['damageStats'] = {camel_case(n): rng.randint(0, 50000) for n in DAMAGE_STATS}
+            frame['position'] = {'x': rng.randint(0, 15000), 'y': rng.randint(0, 15000)}
+            participant_frames[str(participant_id)] = frame
+
+        events = []
+        for _ in range(events_per_frame if minute else 1):
+            kind, key = rng.choice(EVENTS)
+            events.append({'type': kind, 'timestamp': timestamp + rng.randint(0, 59999), key: rng.randint(0, 10),
+                           'itemId': rng.randint(1000, 7000)})
+        frames.append({'events': events, 'participantFrames': participant_frames, 'timestamp': timestamp})
+
+    return {
+        'metadata': {'dataVersion': '2', 'matchId': f'EUW1_{game_id}', 'participants': []},
+        'info': {
+            'frameInterval': 60000,
+            'frames': frames,
+            'gameId': game_id,
+            'participants': [{'participantId': n, 'puuid': f'puuid-{game_id}-{n}'} for n in range(1, 11)],
+        }
+    }
+
+
+def anonymise(payload: Dict, replaced: Dict[str, str]=None) -> Dict:
+    # pass the same `replaced` for a match and its timeline, so both refer to a participant by the same placeholder
+    replaced = {} if replaced is None else replaced
+
+    def placeholder(kind: str, value: str) -> str:
+        if value not in replaced:
+            replaced[value] = f'{kind}-{sum(n.startswith(kind + "-") for n in replaced.values()) + 1}'
+        return replaced[value]
+
+    def visit(node):
+        if isinstance(node, dict):
+            return {k: placeholder(PERSONAL[k], v) if k in PERSONAL and isinstance(v, str) and v else visit(v)
+                    for k, v in node.items()}
+        if isinstance(node, list):
+            return [visit(n) for n in node]
+        return node
+
+    payload = visit(payload)
+    metadata = payload.get('metadata', {})
+    metadata['participants'] = [placeholder('puuid', n) for n in metadata.get('participants', [])]
+    return payload
+
+
+def save(name: str, payload: Dict):
+    FIXTURES.mkdir(exist_ok=True)
+    (FIXTURES / f'{name}.json').write_text(json.dumps(payload, separators=(',', ':')) + '\n')
+
+
+def load(name: str, factory, *args) -> Dict:
+    # recorded responses dropped into benchmarks/fixtures/ take precedence over generated ones
+    path = FIXTURES / f'{name}.json'
+    if path.exists():
+        return json.loads(path.read_text())
+    return factory(*args)
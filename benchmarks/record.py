@@ -0,0 +1,31 @@
+from annie import LeagueApi, Region
+from annie.static import MatchV5
+from .fixtures import anonymise, save
+
+from argparse import ArgumentParser
+from typing import List
+import json
+import sys
+
+
+def main(argv: List[str]=None) -> int:
+    parser = ArgumentParser(description='record a match and its timeline as anonymised benchmark fixtures')
+    parser.add_argument('api_key')
+    parser.add_argument('match_id', help='e.g. EUW1_5812345678')
+    parser.add_argument('--region', default=Region.EUROPE.name, choices=[n.name for n in Region])
+    args = parser.parse_args(argv)
+
+    region = Region[args.region]
+    replaced = {}
+    with LeagueApi(args.api_key) as api:
+        for name, method_name in (('match', MatchV5.match), ('timeline', MatchV5.timeline)):
+            # the raw body is kept, query() would already have translated the keys to snake case
+            payload = json.loads(b''.join(api.stream(region, method_name(args.match_id))))
+            save(name, anonymise(payload, replaced))
+
+    print(f'replaced {len(replaced)} ids and names', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+from annie.api import BaseApi
+from .fixtures import load, match_payload, timeline_payload
+from typing import Dict, List, Union
+from re import sub
+from timeit import repeat
+
+
+def legacy_transform_to_snake_case(data: Union[Dict, List]) -> Dict:
+    translate = None
+    if isinstance(data, list):
+        translate = [legacy_transform_to_snake_case(n) if isinstance(n, (list, dict)) else n for n in data]
+    elif isinstance(data, dict):
+        translate = {}
+        for k, v in data.items():
+            new_key = sub(r'(?<!^)(?=[A-Z])', '_', k).lower()
+            if isinstance(v, (dict, list)):
+                translate[new_key] = legacy_transform_to_snake_case(v)
+            else:
+                translate[new_key] = v
+    return translate
+
+
+def best_of(func, payload, number: int) -> float:
+    return min(repeat(lambda: func(payload), number=number, repeat=5)) / number
+
+
+def main():
+    payloads = {
+        'match': load('match', match_payload, 5812345678),
+        'timeline': load('timeline', timeline_payload, 5812345678),
+    }
+    for name, payload in payloads.items():
+        assert legacy_transform_to_snake_case(payload) == BaseApi.transform_to_snake_case(payload)
+        legacy = best_of(legacy_transform_to_snake_case, payload, 10)
+        current = best_of(BaseApi.transform_to_snake_case, payload, 10)
+        print(f'{name:<10} legacy {legacy*1000:8.2f}ms  memoized {current*1000:8.2f}ms  speedup {legacy/current:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
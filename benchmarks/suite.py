@@ -0,0 +1,175 @@
+from annie import LeagueApi, Database, Region
+from annie.static import SummonerV4
+from .fixtures import load, match_payload, timeline_payload
+from .transport import StubTransport
+
+from argparse import ArgumentParser
+from datetime import datetime
+from itertools import count
+from statistics import median
+from time import perf_counter
+from typing import Callable, Dict, List
+import json
+import platform
+import sys
+import sqlalchemy
+import requests
+
+
+GAME_ID = 5812345678
+
+
+class Fixtures:
+    def __init__(self):
+        self.match = load('match', match_payload, GAME_ID)
+        self.timeline = load('timeline', timeline_payload, GAME_ID)
+        self.summoner = load('summoner', lambda: {
+            'id': 'summoner-id', 'accountId': 'account-id', 'puuid': 'puuid', 'name': 'name',
+            'profileIconId': 1, 'revisionDate': 1650000000000, 'summonerLevel': 100
+        })
+        self._summoner_body = json.dumps(self.summoner).encode()
+
+    @staticmethod
+    def _with_game_id(payload: Dict, match_id: str) -> bytes:
+        # every match id is served as its own game, so database cases never collide on primary keys;
+        # only the ids are rewritten, a byte replace would also hit timestamps containing the same digits
+        metadata = dict(payload['metadata'], matchId=match_id)
+        info = dict(payload['info'], gameId=int(match_id.split('_')[-1]))
+        return json.dumps(dict(payload, metadata=metadata, info=info)).encode()
+
+    def transport(self) -> StubTransport:
+        return StubTransport([
+            (r'/lol/summoner/v4/summoners/.+', self._summoner_body),
+            (r'/lol/match/v5/matches/([^/]+)/timeline', lambda n: self._with_game_id(self.timeline, n[1])),
+            (r'/lol/match/v5/matches/([^/]+)', lambda n: self._with_game_id(self.match, n[1])),
+        ])
+
+    def api(self, records: bool=False) -> LeagueApi:
+        return LeagueApi('RGAPI-benchmark', transport=self.transport(), records=records)
+
+
+def measure(run: Callable, prepare: Callable=None, number: int=10, repeat: int=5,
+            reset: Callable=None) -> Dict[str, float]:
+    # prepare() runs untimed once per call and its result is handed to run()
+    timings = []
+    for _ in range(repeat):
+        arguments = [prepare() for _ in range(number)] if prepare is not None else [None] * number
+        start = perf_counter()
+        for argument in arguments:
+            run() if prepare is None else run(argument)
+        timings.append((perf_counter() - start) / number)
+        if reset is not None:
+            reset()
+
+    return {'best': min(timings), 'median': median(timings), 'number': number, 'repeat': repeat}
+
+
+def database_case(fixtures: Fixtures, method: str, records: bool=False) -> Callable[[int], Dict]:
+    def case(repeat: int) -> Dict:
+        api = fixtures.api(records)
+        database = Database('sqlite://')
+        database.create_schema()
+        ids = count(1)
+
+        def run(entity):
+            getattr(database, method)([entity])
+            database.session.commit()
+
+        return measure(
+            run,
+            prepare=lambda: api.get_match(Region.EUW, f'EUW1_{next(ids)}', fetch_timeline=True),
+            number=5,
+            repeat=repeat,
+            reset=database.session.expunge_all
+        )
+    return case
+
+
+def cases(fixtures: Fixtures) -> Dict[str, Callable[[int], Dict]]:
+    api = fixtures.api()
+    records = fixtures.api(records=True)
+    match = api.get_match(Region.EUW, 'EUW1_1', fetch_timeline=True)
+    match_id = f'EUW1_{GAME_ID}'
+
+    return {
+        'query.overhead': lambda repeat: measure(
+            lambda: api.query(Region.EUW, SummonerV4.by_puuid('puuid')), number=1000, repeat=repeat),
+        'transform_to_snake_case.match': lambda repeat: measure(
+            lambda: LeagueApi.transform_to_snake_case(fixtures.match), number=20, repeat=repeat),
+        'transform_to_snake_case.timeline': lambda repeat: measure(
+            lambda: LeagueApi.transform_to_snake_case(fixtures.timeline), number=5, repeat=repeat),
+        'get_match': lambda repeat: measure(
+            lambda: api.get_match(Region.EUW, match_id), number=20, repeat=repeat),
+        'get_match.records': lambda repeat: measure(
+            lambda: records.get_match(Region.EUW, match_id), number=20, repeat=repeat),
+        'get_timeline': lambda repeat: measure(
+            lambda: api.get_timeline(Region.EUW, match_id), number=5, repeat=repeat),
+        'get_timeline.records': lambda repeat: measure(
+            lambda: records.get_timeline(Region.EUW, match_id), number=5, repeat=repeat),
+        'get_timeline.columnar': lambda repeat: measure(
+            lambda: api.get_timeline(Region.EUW, match_id, columnar=True), number=5, repeat=repeat),
+        'to_dto': lambda repeat: measure(match.to_dto, number=50, repeat=repeat),
+        'database.add': database_case(fixtures, 'add'),
+        'database.merge': database_case(fixtures, 'merge'),
+        'database.upsert': database_case(fixtures, 'upsert'),
+        'database.upsert.records': database_case(fixtures, 'upsert', records=True),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['best'] / baseline[name]['best']
+        result['baseline_ratio'] = ratio
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: List[str]=None) -> int:
+    parser = ArgumentParser(description='time the api -> dto -> database path against recorded responses')
+    parser.add_argument('--output', help='write the json report to this file instead of stdout')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', help='json report of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    fixtures = Fixtures()
+    results = {}
+    for name, case in cases(fixtures).items():
+        if args.filter in name:
+            results[name] = case(args.repeat)
+            print(f'{name:<36} best {results[name]["best"]*1000:10.3f}ms', file=sys.stderr)
+
+    report = {
+        'created': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'requests': requests.__version__,
+        },
+        'results': results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        report['regressions'] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+from annie.static import Region
+from annie.transport import Transport
+from requests import Response
+from typing import Callable, Dict, List, Tuple
+import re
+
+
+class StubTransport(Transport):
+    # serves fixed bodies for uri patterns instead of opening connections, so only annie's own work is measured
+    def __init__(self, routes: List[Tuple[str, bytes | Callable[[re.Match], bytes]]]):
+        super().__init__()
+        self._routes = [(re.compile(pattern), body) for pattern, body in routes]
+        self.requests = 0
+
+    def get(self, region: Region, uri: str, headers: Dict[str, str], stream: bool=False) -> Response:
+        path = uri.split('?', 1)[0].split(region.value, 1)[-1]
+        for pattern, body in self._routes:
+            match = pattern.fullmatch(path)
+            if match is not None:
+                self.requests += 1
+                return self.response(body(match) if callable(body) else body, 200, uri)
+        return self.response(b'{"status": {"message": "Data not found", "status_code": 404}}', 404, uri)
+
+    @staticmethod
+    def response(body: bytes, status_code: int, uri: str) -> Response:
+        r = Response()
+        r.status_code = status_code
+        r.url = uri
+        r.encoding = 'utf-8'
+        r.headers['Content-Type'] = 'application/json;charset=utf-8'
+        r._content = body
+        r._content_consumed = True
+        return r
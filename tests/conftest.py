@@ -0,0 +1,54 @@
+from annie.static import Region
+from annie.transport import Transport
+from requests import Response
+from typing import Dict, List, Tuple
+import json
+import pytest
+
+
+class FakeClock:
+    def __init__(self, now: float=1000.0):
+        self.now = now
+        self.slept: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr('annie.ratelimit.monotonic', clock.monotonic)
+    monkeypatch.setattr('annie.ratelimit.sleep', clock.sleep)
+    monkeypatch.setattr('annie.keys.monotonic', clock.monotonic)
+    return clock
+
+
+def response(status_code: int=200, body=None, headers: Dict[str, str]=None) -> Response:
+    r = Response()
+    r.status_code = status_code
+    r.encoding = 'utf-8'
+    r.headers.update(headers or {})
+    r._content = body if isinstance(body, bytes) else json.dumps(body if body is not None else {}).encode()
+    r._content_consumed = True
+    return r
+
+
+def error(status_code: int, message: str='error', headers: Dict[str, str]=None) -> Response:
+    return response(status_code, {'status': {'message': message, 'status_code': status_code}}, headers)
+
+
+class ScriptedTransport(Transport):
+    # answers requests from a list of prepared responses and records what was asked
+    def __init__(self, responses: List[Response]):
+        super().__init__()
+        self.responses = list(responses)
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+
+    def get(self, region: Region, uri: str, headers: Dict[str, str], stream: bool=False) -> Response:
+        self.requests.append((uri, dict(headers)))
+        return self.responses.pop(0)
@@ -0,0 +1,32 @@
+from annie import LeagueApi, Region, ResponseArchive
+from annie.static import MatchV5
+from benchmarks.transport import StubTransport
+import pytest
+
+
+BODY = b'{\n  "metadata": {"matchId": "EUW1_1"},\n  "text": "a\\nb"\n}'
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'zstd'])
+def test_streamed_bodies_are_archived_one_per_line(tmp_path, compression):
+    archive = ResponseArchive(str(tmp_path), compression=compression)
+    api = LeagueApi('key', transport=StubTransport([(r'/lol/match/v5/matches/.+', BODY)]), archive=archive)
+
+    assert b''.join(api.stream(Region.EUW, MatchV5.timeline('EUW1_1'), chunk_size=7)) == BODY
+    api.query(Region.EUW, MatchV5.match('EUW1_1'))
+
+    records = list(archive.iter('MatchV5.timeline')) + list(archive.iter('MatchV5.match'))
+    assert [n.body for n in records] == [{'metadata': {'matchId': 'EUW1_1'}, 'text': 'a\nb'}] * 2
+
+
+def test_zstd_is_the_default_when_installed(tmp_path):
+    pytest.importorskip('zstandard')
+    assert ResponseArchive(str(tmp_path)).suffix == '.jsonl.zst'
+
+
+def test_shards_of_both_compressions_are_read(tmp_path):
+    pytest.importorskip('zstandard')
+    ResponseArchive(str(tmp_path), compression='gzip').write(Region.EUW, 'MatchV5.match', '/m', '', b'{"n": 1}')
+    ResponseArchive(str(tmp_path), compression='zstd').write(Region.EUW, 'MatchV5.match', '/m', '', b'{"n": 2}')
+
+    assert sorted(n.body['n'] for n in ResponseArchive(str(tmp_path)).iter('MatchV5.match')) == [1, 2]
@@ -0,0 +1,84 @@
+from annie import AsyncLeagueApi, LeagueApi, Region
+from benchmarks.suite import Fixtures
+from threading import Barrier
+import asyncio
+import pytest
+
+
+@pytest.fixture(scope='module')
+def fixtures() -> Fixtures:
+    return Fixtures()
+
+
+def test_close_keeps_an_injected_api_open(monkeypatch):
+    closed = []
+    monkeypatch.setattr(LeagueApi, 'close', lambda self: closed.append(self))
+
+    api = LeagueApi('key')
+    AsyncLeagueApi('key', api=api).close()
+    assert closed == []
+
+
+def test_close_closes_its_own_api(monkeypatch):
+    closed = []
+    monkeypatch.setattr(LeagueApi, 'close', lambda self: closed.append(self))
+
+    wrapper = AsyncLeagueApi('key')
+    wrapper.close()
+    assert closed == [wrapper.api]
+
+
+def test_an_api_key_is_only_needed_without_an_api():
+    AsyncLeagueApi(api=LeagueApi('key')).close()
+    with pytest.raises(ValueError):
+        AsyncLeagueApi()
+
+
+def test_match_and_timeline_are_fetched_in_parallel(fixtures):
+    transport = fixtures.transport()
+    barrier = Barrier(2, timeout=5)
+    get = transport.get
+
+    def parallel_get(*args, **kwargs):
+        # both requests have to arrive before either is answered, a sequential fetch breaks the barrier
+        barrier.wait()
+        return get(*args, **kwargs)
+
+    transport.get = parallel_get
+    api = AsyncLeagueApi('key', transport=transport)
+    match = asyncio.run(api.get_match(Region.EUW, 'EUW1_1', fetch_timeline=True))
+    api.close()
+    assert match.game_id == 1
+    assert len(match.timeline_events) > 0
+    assert transport.requests == 2
+
+
+def test_lazy_timeline_is_fetched_on_access(fixtures):
+    transport = fixtures.transport()
+    api = AsyncLeagueApi('key', transport=transport)
+    match = asyncio.run(api.get_match(Region.EUW, 'EUW1_2', lazy_timeline=True))
+    assert 'timeline_events' not in repr(match)
+    assert transport.requests == 1
+    assert len(match.timeline_events) > 0
+    assert transport.requests == 2
+    api.close()
+
+
+def test_gather_respects_concurrency():
+    active, peak = 0, 0
+
+    async def task(n: int) -> int:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return n
+
+    api = AsyncLeagueApi(api=LeagueApi('key'), concurrency=4)
+    assert asyncio.run(api.gather([task(n) for n in range(10)], concurrency=2)) == list(range(10))
+    assert peak == 2
+    peak = 0
+    asyncio.run(api.gather([task(n) for n in range(10)]))
+    assert peak == 4
+    api.close()
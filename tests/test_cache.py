@@ -0,0 +1,143 @@
+from annie import MethodCache, SqliteResponseCache, LeagueApi, Region
+from annie.static import MatchV5
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from time import monotonic, sleep
+import pytest
+import sqlite3
+import zlib
+
+
+def wait_for(condition, timeout: float=5.0):
+    deadline = monotonic() + timeout
+    while not condition():
+        if monotonic() > deadline:
+            pytest.fail('timed out waiting for the workers')
+        sleep(0.001)
+
+
+def test_concurrent_misses_call_once():
+    cache = MethodCache()
+    release = Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(cache.get_or_call, 'key', load) for _ in range(8)]
+        wait_for(lambda: cache.stats.misses + cache.stats.coalesced == 8)
+        release.set()
+        assert [n.result() for n in futures] == ['value'] * 8
+
+    assert len(calls) == 1
+    assert (cache.stats.misses, cache.stats.coalesced) == (1, 7)
+    assert cache.get_or_call('key', load) == 'value'
+    assert cache.stats.hits == 1
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    cache = MethodCache()
+    release = Event()
+
+    def fail():
+        release.wait(5)
+        raise KeyError('gone')
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cache.get_or_call, 'key', fail) for _ in range(4)]
+        wait_for(lambda: cache.stats.misses + cache.stats.coalesced == 4)
+        release.set()
+        for future in futures:
+            with pytest.raises(KeyError):
+                future.result()
+
+    assert cache.get_or_call('key', lambda: 'value') == 'value'
+    assert len(cache) == 1
+
+
+class Clock:
+    def __init__(self, now: float=1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def now(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr('annie.cache.time', clock)
+    return clock
+
+
+def test_responses_expire_after_their_ttl(now):
+    cache = SqliteResponseCache(':memory:', ttl={'LeagueV4': 60, 'MatchV5.match': None})
+    cache.set('league', 'LeagueV4.entries', b'league')
+    cache.set('match', 'MatchV5.match', b'match')
+    cache.set('summoner', 'SummonerV4.by_puuid', b'summoner')
+
+    now.now += 59
+    assert cache.get('league') == b'league'
+    now.now += 1
+    assert cache.get('league') is None
+    assert cache.get('match') == b'match'
+    assert cache.get('summoner') is None
+    assert cache.size == len(zlib.compress(b'match', 6))
+
+
+def test_least_recently_used_responses_are_evicted(now):
+    body = bytes(range(256)) * 4
+    size = len(zlib.compress(body, 6))
+    cache = SqliteResponseCache(':memory:', max_size=2 * size, ttl={'MatchV5.match': None})
+    cache.set('a', 'MatchV5.match', body)
+    now.now += 1
+    cache.set('b', 'MatchV5.match', body)
+    now.now += 1
+    assert cache.get('a') == body
+    now.now += 1
+    cache.set('c', 'MatchV5.match', body)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == body
+    assert cache.get('c') == body
+    assert cache.size == 2 * size
+
+
+def test_streamed_responses_are_stored_compressed(now):
+    cache = SqliteResponseCache(':memory:', ttl={'MatchV5.timeline': None})
+    body = b'{"frames": [' + b','.join(b'{"timestamp": %d}' % n for n in range(1000)) + b']}'
+    writer = cache.writer('timeline', 'MatchV5.timeline')
+    for n in range(0, len(body), 100):
+        writer.write(body[n:n+100])
+    assert cache.get('timeline') is None
+
+    writer.commit()
+    assert cache.get('timeline') == body
+    assert cache.size < len(body)
+
+
+def test_closing_an_api_leaves_a_shared_cache_open(now):
+    cache = SqliteResponseCache(':memory:', ttl={'MatchV5.match': None})
+    LeagueApi('key', cache=cache).close()
+
+    cache.set(f'EUROPE:{MatchV5.match("EUW1_1")}?', 'MatchV5.match', b'{"gameId": 1}')
+    assert LeagueApi('key', cache=cache).query(Region.EUROPE, MatchV5.match('EUW1_1')) == {'game_id': 1}
+    cache.close()
+
+
+def test_caches_without_fingerprints_are_migrated(tmp_path):
+    path = str(tmp_path / 'responses.db')
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE responses ('
+                       'key TEXT PRIMARY KEY, endpoint TEXT, expires REAL, accessed REAL, size INTEGER, body BLOB)')
+    connection.execute("INSERT INTO responses VALUES ('old', 'MatchV5.match', NULL, 0, 5, ?)", (zlib.compress(b'match'),))
+    connection.commit()
+    connection.close()
+
+    cache = SqliteResponseCache(path)
+    assert cache.entry('old') == (b'match', None)
+    cache.set('new', 'MatchV5.match', b'match', 'fingerprint')
+    assert cache.entry('new') == (b'match', 'fingerprint')
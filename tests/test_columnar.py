@@ -0,0 +1,43 @@
+from annie import LeagueApi
+from annie.columnar import PARTICIPANT_FRAME_COLUMNS, EVENT_COLUMNS, build_timeline_columns
+from benchmarks.suite import Fixtures
+import copy
+import pytest
+
+
+@pytest.fixture(scope='module')
+def timeline() -> dict:
+    timeline = LeagueApi.transform_to_snake_case(Fixtures().timeline)
+    last = timeline['info']['frames'][-1]
+    last['events'].append({'type': 'GAME_END', 'timestamp': last['timestamp'] + 1, 'winning_team': 100})
+    last['events'].append({'type': 'NOT_A_KNOWN_EVENT', 'timestamp': last['timestamp'] + 2, 'participant_id': 1})
+    return timeline
+
+
+def test_columns_match_the_dtos_row_by_row(timeline):
+    columns = build_timeline_columns(copy.deepcopy(timeline))
+    dtos = LeagueApi._create_timeline_dtos(copy.deepcopy(timeline), records=True)
+
+    assert len(columns.participants['game_id']) == len(dtos['participants'])
+    for name in PARTICIPANT_FRAME_COLUMNS:
+        assert list(columns.participants[name]) == [getattr(n, name) for n in dtos['participants']]
+
+    assert len(columns.events['game_id']) == len(dtos['events'])
+    for name in EVENT_COLUMNS:
+        expected = [getattr(n, name) for n in dtos['events']]
+        if name == 'participant_id':
+            expected = [-1 if n is None else n for n in expected]
+        assert list(columns.events[name]) == expected
+
+
+def test_events_without_a_participant_use_minus_one(timeline):
+    columns = build_timeline_columns(copy.deepcopy(timeline))
+    assert columns.events['kind'][-1] == 'GAME_END'
+    assert columns.events['participant_id'][-1] == -1
+
+
+def test_unknown_events_are_skipped(timeline):
+    columns = build_timeline_columns(copy.deepcopy(timeline))
+    assert 'NOT_A_KNOWN_EVENT' not in columns.events['kind']
+    events = sum(len(n['events']) for n in timeline['info']['frames'])
+    assert len(columns.events['kind']) == events - 1
@@ -0,0 +1,189 @@
+from annie import Database, LeagueApi, Region
+from annie.dto import SummonerDto, LeagueEntryDto, MatchInfoDto, MatchParticipantDto, walk, flatten
+from annie.static import Queue, Tier, Division
+from benchmarks.fixtures import match_payload
+from datetime import datetime
+from sqlalchemy import select, func, inspect
+from threading import Thread
+from .conftest import FakeClock
+import pytest
+
+
+def summoner(summoner_id: str, level: int) -> SummonerDto:
+    return SummonerDto(region='EUW', summoner_id=summoner_id, profile_icon_id=1, revision_date=datetime(2022, 1, 1),
+                       summoner_name=summoner_id, account_id='account', puuid=f'puuid-{summoner_id}',
+                       summoner_level=level)
+
+
+def match(game_id: int) -> MatchInfoDto:
+    return LeagueApi._create_match_dto(LeagueApi.transform_to_snake_case(match_payload(game_id)))
+
+
+def database() -> Database:
+    database = Database('sqlite://')
+    database.create_schema()
+    return database
+
+
+def test_upsert_rows_inserts_and_updates():
+    db = database()
+    db.upsert_rows(Database.rows_of([summoner('a', 1), summoner('b', 1)]))
+    db.upsert_rows({'summoner': [
+        {'region': 'EUW', 'summoner_id': 'a', 'profile_icon_id': 1, 'revision_date': datetime(2022, 1, 1),
+         'summoner_name': 'a', 'account_id': 'account', 'puuid': 'puuid-a', 'summoner_level': 2},
+        Database.rows_of(summoner('c', 5))['summoner'][0],
+        Database.rows_of(summoner('c', 7))['summoner'][0],
+    ]})
+
+    levels = dict(db.session.execute(select(SummonerDto.summoner_id, SummonerDto.summoner_level)).all())
+    assert levels == {'a': 2, 'b': 1, 'c': 7}
+
+
+def test_upsert_of_a_match_is_idempotent():
+    db = database()
+    db.upsert(match(1))
+    db.upsert([match(1), match(2)])
+
+    assert db.session.execute(select(func.count()).select_from(MatchInfoDto)).scalar() == 2
+    assert db.session.execute(select(func.count()).select_from(MatchParticipantDto)).scalar() == 20
+
+
+def test_walk_visits_every_node_once_in_pre_order():
+    entity = match(1)
+    nodes = list(walk(entity))
+
+    assert nodes[0] is entity
+    assert nodes[1] is entity.participants[0]
+    assert len(nodes) == len({id(n) for n in nodes})
+    assert len(flatten(entity)[MatchParticipantDto.__table__]) == 10
+
+    shared = list(walk([entity, entity.participants[0]]))
+    assert len(shared) == len(nodes)
+
+
+def played(game_id: int, creation: int, version: str='12.8.425.3026', queue_id: int=420) -> MatchInfoDto:
+    payload = match_payload(game_id)
+    info = payload['info']
+    info.update(gameCreation=creation, gameStartTimestamp=creation, gameEndTimestamp=creation, gameVersion=version,
+                queueId=queue_id)
+    for n, participant in enumerate(info['participants'], 1):
+        participant.update(puuid=f'player-{n}', championId=n, championName=f'champion-{n}',
+                           win=participant['teamId'] == 100)
+    return LeagueApi._create_match_dto(LeagueApi.transform_to_snake_case(payload))
+
+
+def entry(summoner_id: str, tier: str, rank: str, league_points: int) -> LeagueEntryDto:
+    return LeagueEntryDto(region='EUW', summoner_id=summoner_id, league_id='league', queue_type=Queue.SOLO.value,
+                          summoner_name=summoner_id, tier=tier, rank=rank, league_points=league_points, wins=1,
+                          losses=1, hot_streak=False, veteran=False, fresh_blood=False, inactive=False)
+
+
+def test_recent_matches_page_through_games_created_at_the_same_time():
+    db = database()
+    db.upsert([played(1, 1000), played(2, 1000), played(3, 1000), played(4, 2000), played(5, 3000, queue_id=440)])
+
+    first = db.recent_matches('player-1', queue_id=420, limit=2)
+    assert [n.game_id for n in first] == [4, 3]
+    second = db.recent_matches('player-1', queue_id=420, before=(first[-1].game_creation, first[-1].game_id), limit=2)
+    assert [n.game_id for n in second] == [2, 1]
+    assert db.recent_matches('player-1', queue_id=420, before=(second[-1].game_creation, second[-1].game_id)) == []
+
+    assert [n.game_id for n in db.recent_matches('player-1')] == [5, 4, 3, 2, 1]
+    assert db.recent_matches('player-2', limit=1)[0].champion_id == 2
+
+
+def test_champion_win_rates_list_the_newest_version_first():
+    db = database()
+    db.upsert([played(1, 1000, '12.9.1'), played(2, 2000, '12.9.2'), played(3, 3000, '12.10.1')])
+
+    rates = db.champion_win_rates()
+    assert [n.game_version for n in rates[:10]] == ['12.10.1'] * 10
+    assert [n.game_version for n in rates[10:20]] == ['12.9.2'] * 10
+
+    patch = db.champion_win_rates('12.9', min_games=1)
+    assert {n.game_version for n in patch} == {'12.9.1', '12.9.2'}
+    winner = [n for n in db.champion_win_rates('12.10.1') if n.champion_id == 1][0]
+    loser = [n for n in db.champion_win_rates('12.10.1') if n.champion_id == 6][0]
+    assert (winner.games, winner.wins, winner.win_rate) == (1, 1, 1.0)
+    assert (loser.games, loser.wins, loser.win_rate) == (1, 0, 0.0)
+    assert db.champion_win_rates(min_games=2) == []
+
+
+def test_ladder_snapshot_orders_by_division_and_league_points():
+    db = database()
+    db.upsert([entry('a', 'GOLD', 'II', 50), entry('b', 'GOLD', 'I', 10), entry('c', 'GOLD', 'I', 90),
+               entry('d', 'SILVER', 'I', 99)])
+
+    assert [n.summoner_id for n in db.ladder_snapshot(Region.EUW, Queue.SOLO, Tier.GOLD)] == ['c', 'b', 'a']
+    assert [n.summoner_id for n in db.ladder_snapshot(Region.EUW, Queue.SOLO, 'GOLD', Division.II)] == ['a']
+    assert [n.summoner_id for n in db.ladder_snapshot(Region.EUW, Queue.SOLO, Tier.GOLD, limit=1, offset=1)] == ['b']
+    assert db.ladder_snapshot(Region.EUW, Queue.FLEX, Tier.GOLD) == []
+
+
+def test_create_indexes_adds_indexes_missing_from_an_existing_database():
+    db = database()
+    index = next(n for n in MatchInfoDto.__table__.indexes if n.name == 'ix_matches_game_creation')
+    index.drop(db.engine)
+    assert 'ix_matches_game_creation' not in {n['name'] for n in inspect(db.engine).get_indexes('matches')}
+
+    db.create_indexes()
+    db.create_indexes()
+    assert 'ix_matches_game_creation' in {n['name'] for n in inspect(db.engine).get_indexes('matches')}
+
+
+def stored_levels(db: Database) -> dict:
+    return dict(db.session.execute(select(SummonerDto.summoner_id, SummonerDto.summoner_level)).all())
+
+
+def test_unit_of_work_commits_every_max_objects():
+    db = database()
+    with db.unit_of_work(max_objects=2) as work:
+        work.add([summoner('a', 1), summoner('b', 1), summoner('c', 1)])
+        assert sorted(stored_levels(db)) == ['a', 'b']
+        assert work.pending == 1
+    assert sorted(stored_levels(db)) == ['a', 'b', 'c']
+
+
+def test_unit_of_work_commits_after_max_seconds(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr('annie.database.monotonic', clock.monotonic)
+    db = database()
+    with db.unit_of_work(max_seconds=30) as work:
+        work.add(summoner('a', 1))
+        assert stored_levels(db) == {}
+        clock.now += 30
+        work.merge(summoner('b', 1))
+        assert sorted(stored_levels(db)) == ['a', 'b']
+        assert work.pending == 0
+
+
+def test_unit_of_work_rolls_back_what_was_not_committed():
+    db = database()
+    with pytest.raises(RuntimeError):
+        with db.unit_of_work(max_objects=2) as work:
+            work.add([summoner('a', 1), summoner('b', 1), summoner('c', 1)])
+            raise RuntimeError('interrupted')
+    assert sorted(stored_levels(db)) == ['a', 'b']
+
+
+def test_add_and_merge_go_through_batches():
+    db = database()
+    db.add([summoner('a', 1), summoner('b', 1), summoner('c', 1)], batch_size=2)
+    db.merge([summoner('a', 2), summoner('d', 1)], batch_size=1)
+    assert stored_levels(db) == {'a': 2, 'b': 1, 'c': 1, 'd': 1}
+
+
+def test_each_thread_gets_its_own_session_until_released():
+    db = database()
+    session = db.session
+    assert db.session is session
+
+    sessions = []
+    thread = Thread(target=lambda: sessions.extend([db.session, db.session]))
+    thread.start()
+    thread.join()
+    assert sessions[0] is sessions[1]
+    assert sessions[0] is not session
+
+    db.release()
+    assert db.session is not session
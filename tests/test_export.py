@@ -0,0 +1,49 @@
+from annie import Database, Region, TimelineStore, IngestPipeline, ArrowExporter
+from benchmarks.suite import Fixtures
+import pytest
+
+pyarrow = pytest.importorskip('pyarrow')
+import pyarrow.ipc
+import pyarrow.parquet
+
+
+@pytest.fixture(scope='module')
+def database() -> Database:
+    database = Database('sqlite://')
+    database.create_schema()
+    store = TimelineStore(database, partition='patch')
+    IngestPipeline(Fixtures().api(), database, fetch_timeline=True, timeline_store=store).ingest(
+        Region.EUW, ['EUW1_1', 'EUW1_2', 'EUW1_3']
+    )
+    return database
+
+
+def read(path):
+    if path.suffix == '.parquet':
+        return pyarrow.parquet.read_table(path)
+    with pyarrow.ipc.open_file(path) as reader:
+        return reader.read_all()
+
+
+@pytest.mark.parametrize('format', ['parquet', 'arrow'])
+def test_export_round_trips(tmp_path, database, format):
+    exported = ArrowExporter(database, format=format, batch_size=7).export(tmp_path)
+
+    partitions = database.timeline_store.partitions()
+    assert partitions and set(partitions) <= set(exported)
+    assert all(n in exported for n in ('matches', 'participants', 'timeline_events'))
+
+    for name, rows in exported.items():
+        table = read(tmp_path / f'{name}.{format}')
+        assert table.num_rows == rows
+
+    matches = read(tmp_path / f'matches.{format}')
+    assert sorted(matches.column('game_id').to_pylist()) == [1, 2, 3]
+    assert exported['participants'] == 30
+    assert sum(exported[n] for n in partitions if n.startswith('timeline_events_')) > 0
+
+
+def test_export_filters(tmp_path, database):
+    exporter = ArrowExporter(database)
+    assert exporter.export(tmp_path, tables=['matches'], queue_id=-1) == {'matches': 0}
+    assert read(tmp_path / 'matches.parquet').num_rows == 0
@@ -0,0 +1,42 @@
+from annie import LeagueApi, Database, Region, IngestPipeline
+from benchmarks.fixtures import match_payload
+from benchmarks.transport import StubTransport
+import json
+import requests
+
+
+class FailingTransport(StubTransport):
+    def get(self, region, uri, headers, stream=False):
+        if 'EUW1_4' in uri:
+            raise requests.ConnectionError('connection reset')
+        if 'by-puuid/broken' in uri:
+            return self.response(b'{"status": {"message": "boom", "status_code": 500}}', 500, uri)
+        return super().get(region, uri, headers, stream)
+
+
+def pipeline() -> IngestPipeline:
+    transport = FailingTransport([
+        (r'/lol/match/v5/matches/by-puuid/.+/ids', json.dumps(['EUW1_1', 'EUW1_2', 'EUW1_3', 'EUW1_4']).encode()),
+        (r'/lol/match/v5/matches/EUW1_1', json.dumps(match_payload(1)).encode()),
+        (r'/lol/match/v5/matches/EUW1_2', b'{"metadata": '),
+    ])
+    database = Database('sqlite://')
+    database.create_schema()
+    return IngestPipeline(LeagueApi('key', transport=transport, retries=0), database, workers=2)
+
+
+def test_failures_are_reported_per_match():
+    report = pipeline().ingest(Region.EUW, ['EUW1_1', 'EUW1_2', 'EUW1_3', 'EUW1_4'])
+
+    assert report.committed == 1
+    assert report.failed == 3
+    assert report.errors['EUW1_2'].startswith('parse failed')
+    assert report.errors['EUW1_3'].startswith('404')
+    assert report.errors['EUW1_4'].startswith('request failed')
+
+
+def test_a_failing_history_does_not_abort_the_run():
+    report = pipeline().ingest_history(Region.EUW, ['broken', 'player'])
+
+    assert report.committed == 1
+    assert report.errors['broken'].startswith('500')
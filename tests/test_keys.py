@@ -0,0 +1,98 @@
+from annie import LeagueApi, Region, SqliteResponseCache, ApiKeyPool, RateLimiter
+from annie.static import SummonerV4
+from .conftest import ScriptedTransport, response, error
+from benchmarks.fixtures import match_payload
+from benchmarks.transport import StubTransport
+import json
+
+
+SUMMONER = {'id': 'summoner-1-1', 'accountId': 'account', 'puuid': 'puuid-1-1', 'name': 'name',
+            'profileIconId': 1, 'revisionDate': 1650000000000, 'summonerLevel': 100}
+
+
+class RecordingTransport(StubTransport):
+    def __init__(self, routes):
+        super().__init__(routes)
+        self.tokens = []
+
+    def get(self, region, uri, headers, stream=False):
+        self.tokens.append(headers['X-Riot-Token'])
+        return super().get(region, uri, headers, stream)
+
+
+def transport() -> RecordingTransport:
+    return RecordingTransport([
+        (r'/lol/summoner/v4/summoners/.+', json.dumps(SUMMONER).encode()),
+        (r'/lol/match/v5/matches/EUW1_1', json.dumps(match_payload(1)).encode()),
+    ])
+
+
+def test_participants_are_pinned_to_the_key_that_fetched_the_match():
+    api = LeagueApi(['a', 'b'], transport=transport())
+    api._keys.pin('b', 'match:EUW1_1')
+
+    api.get_match(Region.EUW, 'EUW1_1')
+    assert api._keys.pinned('puuid-1-1') == 'b'
+    assert api._keys.pinned('summoner-1-10') == 'b'
+
+    api.get_summoner(Region.EUW, puuid='puuid-1-1')
+    assert api._transport.tokens == ['b', 'b']
+
+
+def test_cached_matches_pin_the_key_that_fetched_them(tmp_path):
+    cache = SqliteResponseCache(str(tmp_path / 'responses.db'))
+    warm = LeagueApi(['a', 'b'], transport=transport(), cache=cache)
+    warm._keys.pin('b', 'match:EUW1_1')
+    warm.get_match(Region.EUW, 'EUW1_1')
+    assert warm._transport.tokens == ['b']
+
+    api = LeagueApi(['a', 'b'], transport=transport(), cache=cache)
+    api.get_match(Region.EUW, 'EUW1_1')
+    assert api._transport.tokens == []
+    assert api._keys.pinned('match:EUW1_1') == 'b'
+    assert api._keys.pinned('puuid-1-1') == 'b'
+
+    api.get_summoner(Region.EUW, puuid='puuid-1-1')
+    assert api._transport.tokens == ['b']
+
+
+def test_cached_matches_of_an_unknown_key_are_fetched_again(tmp_path):
+    cache = SqliteResponseCache(str(tmp_path / 'responses.db'))
+    LeagueApi(['a'], transport=transport(), cache=cache).get_match(Region.EUW, 'EUW1_1')
+
+    api = LeagueApi(['c'], transport=transport(), cache=cache)
+    api.get_match(Region.EUW, 'EUW1_1')
+    assert api._transport.tokens == ['c']
+    assert api._keys.pinned('puuid-1-1') == 'c'
+
+    # the refetched body replaced the cached one and now belongs to this pool
+    again = LeagueApi(['c'], transport=transport(), cache=cache)
+    again.get_match(Region.EUW, 'EUW1_1')
+    assert again._transport.tokens == []
+
+
+def test_rejected_keys_fail_over_and_cool_down(clock):
+    limiter = RateLimiter(margin=0)
+    pool = ApiKeyPool(['a', 'b'], limiter, invalid_cooldown=60)
+
+    pool.report('a', 403)
+    assert pool.active() == ['b']
+    assert pool.select(Region.EUW, 'MatchV5.match') == 'b'
+
+    pool.report('b', 429, retry_after=5)
+    assert pool.active() == []
+    assert pool.select(Region.EUW, 'MatchV5.match') == 'b'
+
+    clock.now += 5
+    assert pool.active() == ['b']
+    clock.now += 55
+    assert pool.active() == ['a', 'b']
+
+
+def test_query_moves_to_another_key_after_a_rejection(clock):
+    transport = ScriptedTransport([error(403, 'forbidden'), response(200, {'puuid': 'a'})])
+    api = LeagueApi(['a', 'b'], transport=transport, rate_limiter=RateLimiter(margin=0))
+
+    assert api.query(Region.EUW, SummonerV4.by_puuid('a'), pin='a') == {'puuid': 'a'}
+    assert [headers['X-Riot-Token'] for _, headers in transport.requests] == ['a', 'b']
+    assert api._keys.pinned('a') == 'b'
@@ -0,0 +1,43 @@
+from annie import LeagueApi, LadderCrawler, Region, Queue, Tier, Division, ApiException
+from annie.ladder import ladder_divisions
+from benchmarks.transport import StubTransport
+import json
+
+
+def item(summoner_id: str) -> dict:
+    return {'summonerId': summoner_id, 'summonerName': summoner_id, 'leaguePoints': 1000, 'rank': 'I',
+            'wins': 10, 'losses': 5, 'veteran': False, 'inactive': False, 'freshBlood': False, 'hotStreak': True}
+
+
+def crawler(**kwargs) -> LadderCrawler:
+    league = {'tier': 'CHALLENGER', 'leagueId': 'league', 'queue': 'RANKED_SOLO_5x5', 'name': 'name',
+              'entries': [item('a'), item('b')]}
+    transport = StubTransport([
+        (r'/lol/league/v4/challengerleagues/by-queue/RANKED_SOLO_5x5', json.dumps(league).encode()),
+        (r'/lol/league/v4/entries/RANKED_SOLO_5x5/DIAMOND/I', b'[]'),
+    ])
+    return LadderCrawler(LeagueApi('key', transport=transport, retries=0), workers=2, **kwargs)
+
+
+def test_apex_tiers_have_no_divisions():
+    assert ladder_divisions([Tier.CHALLENGER, Tier.DIAMOND], [Division.I]) == [
+        (Tier.CHALLENGER, None), (Tier.DIAMOND, Division.I)
+    ]
+
+
+def test_apex_tiers_come_from_the_league_list():
+    entries = [n for page in crawler().iter_entries(Region.EUW, Queue.SOLO, [Tier.CHALLENGER]) for n in page]
+
+    assert sorted(n.summoner_id for n in entries) == ['a', 'b']
+    assert {(n.tier, n.queue_type, n.league_id) for n in entries} == {('CHALLENGER', 'RANKED_SOLO_5x5', 'league')}
+
+
+def test_a_failing_division_is_reported():
+    reported = []
+    ladder = crawler(on_error=lambda *args: reported.append(args))
+    pages = list(ladder.iter_entries(Region.EUW, Queue.SOLO, [Tier.CHALLENGER, Tier.DIAMOND], [Division.I, Division.II]))
+
+    assert len(pages) == 1
+    assert list(ladder.errors) == [(Tier.DIAMOND, Division.II)]
+    assert isinstance(ladder.errors[(Tier.DIAMOND, Division.II)], ApiException)
+    assert [(tier, division) for tier, division, _ in reported] == [(Tier.DIAMOND, Division.II)]
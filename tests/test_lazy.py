@@ -0,0 +1,71 @@
+from annie import Database, Region
+from annie.dto import MatchEventDto
+from benchmarks.suite import Fixtures
+from sqlalchemy import select, func
+import pytest
+
+
+@pytest.fixture(scope='module')
+def fixtures() -> Fixtures:
+    return Fixtures()
+
+
+def test_timeline_survives_add_and_commit(fixtures):
+    api = fixtures.api()
+    database = Database('sqlite://')
+    database.create_schema()
+
+    match = api.get_match(Region.EUW, 'EUW1_5', lazy_timeline=True)
+    database.add([match])
+    assert api._transport.requests == 1
+    assert database.session.execute(select(func.count()).select_from(MatchEventDto)).scalar() == 0
+
+    assert len(match.timeline_events) == len(fixtures.api().get_timeline(Region.EUW, 'EUW1_5')['events'])
+    assert len(match.timeline_participants) > 0
+    assert api._transport.requests == 2
+
+    database.session.expire_all()
+    assert match.game_id == 5
+    assert len(match.timeline_events) > 0
+    assert api._transport.requests == 2
+
+
+def test_stored_timeline_is_read_before_requesting(fixtures):
+    api = fixtures.api()
+    database = Database('sqlite://')
+    database.create_schema()
+    database.add([api.get_match(Region.EUW, 'EUW1_6', fetch_timeline=True)])
+
+    match = api.get_match(Region.EUW, 'EUW1_6', lazy_timeline=True, database=database)
+    assert len(match.timeline_events) > 0
+    assert api._transport.requests == 3
+
+
+def test_merge_and_unit_of_work_leave_an_untouched_timeline_unfetched(fixtures):
+    api = fixtures.api()
+    database = Database('sqlite://')
+    database.create_schema()
+
+    merged = api.get_match(Region.EUW, 'EUW1_7', lazy_timeline=True)
+    database.merge([merged])
+    added = api.get_match(Region.EUW, 'EUW1_8', lazy_timeline=True)
+    with database.unit_of_work(max_objects=1) as work:
+        work.add(added)
+    assert api._transport.requests == 2
+    assert database.session.execute(select(func.count()).select_from(MatchEventDto)).scalar() == 0
+
+    # the loaders stay registered on the originals after their session committed and closed
+    assert len(merged.timeline_events) > 0
+    assert len(added.timeline_participants) > 0
+    assert api._transport.requests == 4
+
+
+def test_a_loaded_timeline_is_merged(fixtures):
+    api = fixtures.api()
+    database = Database('sqlite://')
+    database.create_schema()
+
+    match = api.get_match(Region.EUW, 'EUW1_9', lazy_timeline=True)
+    events = len(match.timeline_events)
+    database.merge([match])
+    assert database.session.execute(select(func.count()).select_from(MatchEventDto)).scalar() == events
@@ -0,0 +1,142 @@
+from annie import LeagueApi, Database, Region
+from annie.metrics import Instrumentation, Histogram, Metrics, StatsdInstrumentation
+from annie.static import SummonerV4
+from annie.dto import SummonerDto
+from .conftest import ScriptedTransport, response
+from datetime import datetime
+import socket
+import pytest
+
+
+class Recorder(Instrumentation):
+    def __init__(self):
+        self.calls = []
+
+    def on_request(self, *args):
+        self.calls.append(('request', *args))
+
+    def on_bytes(self, *args):
+        self.calls.append(('bytes', *args))
+
+    def on_rate_limit_wait(self, *args):
+        self.calls.append(('rate_limit_wait', *args))
+
+    def on_cache(self, *args):
+        self.calls.append(('cache', *args))
+
+    def on_parse(self, *args):
+        self.calls.append(('parse', *args))
+
+    def on_database(self, *args):
+        self.calls.append(('database', *args))
+
+    def names(self):
+        return [n[0] for n in self.calls]
+
+
+def summoner(summoner_id: str) -> SummonerDto:
+    return SummonerDto(region='EUW', summoner_id=summoner_id, profile_icon_id=1, revision_date=datetime(2022, 1, 1),
+                       summoner_name=summoner_id, account_id='account', puuid=f'puuid-{summoner_id}',
+                       summoner_level=1)
+
+
+def test_histogram_buckets_are_upper_bounds():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 1.0, 3.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 2, 1]
+    assert histogram.cumulative() == [('0.1', 2), ('1.0', 4), ('+Inf', 5)]
+    assert (histogram.count, histogram.sum) == (5, pytest.approx(4.65))
+
+
+def test_prometheus_text():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.on_request(Region.EUW, 'MatchV5.match', 200, 0.5)
+    metrics.on_request(Region.EUW, 'MatchV5.match', 200, 0.05)
+    metrics.on_bytes(Region.EUW, 'MatchV5.match', 1024)
+    metrics.on_database('upsert.matches', 0.2, 10)
+    text = metrics.to_prometheus()
+
+    assert text.endswith('\n')
+    lines = text.splitlines()
+    assert '# TYPE annie_requests_total counter' in lines
+    assert 'annie_requests_total{region="EUW",endpoint="MatchV5.match",status="200"} 2' in lines
+    assert 'annie_received_bytes_total{region="EUW",endpoint="MatchV5.match"} 1024' in lines
+    assert '# TYPE annie_request_seconds histogram' in lines
+    assert 'annie_request_seconds_bucket{region="EUW",endpoint="MatchV5.match",le="0.1"} 1' in lines
+    assert 'annie_request_seconds_bucket{region="EUW",endpoint="MatchV5.match",le="1.0"} 2' in lines
+    assert 'annie_request_seconds_bucket{region="EUW",endpoint="MatchV5.match",le="+Inf"} 2' in lines
+    assert 'annie_request_seconds_count{region="EUW",endpoint="MatchV5.match"} 2' in lines
+    assert 'annie_database_rows_total{operation="upsert.matches"} 10' in lines
+
+    metrics.reset()
+    assert 'annie_requests_total{' not in metrics.to_prometheus()
+
+
+def test_cache_hit_ratio():
+    metrics = Metrics()
+    for hit in (True, True, True, False):
+        metrics.on_cache('MatchV5.match', hit)
+    metrics.on_cache('get_summoner', False)
+
+    assert metrics.cache_hit_ratio() == {'MatchV5.match': 0.75, 'get_summoner': 0.0}
+    assert 'annie_cache_hit_ratio{cache="MatchV5.match"} 0.75' in metrics.to_prometheus().splitlines()
+
+
+def test_statsd_lines():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(5)
+    statsd = StatsdInstrumentation('127.0.0.1', receiver.getsockname()[1], prefix='test')
+
+    statsd.on_request(Region.EUW, 'MatchV5.match', 200, 0.012)
+    statsd.on_cache('MatchV5.match', True)
+    statsd.on_database('upsert.matches', 0.5, 3)
+    statsd.close()
+
+    lines = [receiver.recv(1024).decode() for _ in range(5)]
+    receiver.close()
+    assert lines == [
+        'test.request.EUW.MatchV5_match:12.000|ms',
+        'test.status.EUW.MatchV5_match.200:1|c',
+        'test.cache.MatchV5_match.hit:1|c',
+        'test.database.upsert.matches:500.000|ms',
+        'test.database.upsert.matches.rows:3|c',
+    ]
+
+
+def test_requests_report_to_the_instrumentation():
+    recorder = Recorder()
+    transport = ScriptedTransport([response(200, {'puuid': 'a'})])
+    api = LeagueApi('key', transport=transport, instrumentation=[recorder])
+
+    api.query(Region.EUW, SummonerV4.by_puuid('a'))
+    assert recorder.names() == ['rate_limit_wait', 'request', 'bytes', 'parse']
+    assert recorder.calls[1][1:4] == (Region.EUW, 'SummonerV4.by_puuid', 200)
+    assert recorder.calls[2][3] == len(b'{"puuid": "a"}')
+
+
+def test_session_flushes_and_commits_are_timed():
+    recorder = Recorder()
+    database = Database('sqlite://', instrumentation=recorder)
+    database.create_schema()
+
+    database.session.add(summoner('a'))
+    database.session.commit()
+    assert [n[1] for n in recorder.calls] == ['flush', 'commit']
+
+    recorder.calls.clear()
+    with database.unit_of_work() as work:
+        work.add(summoner('b'))
+    assert [n[1] for n in recorder.calls] == ['flush', 'commit']
+
+
+def test_upserts_report_rows_per_table():
+    recorder = Recorder()
+    database = Database('sqlite://', instrumentation=recorder)
+    database.create_schema()
+
+    database.upsert_rows(Database.rows_of([summoner('a'), summoner('b')]))
+    upserts = [n for n in recorder.calls if n[1].startswith('upsert.')]
+    assert [(n[1], n[3]) for n in upserts] == [('upsert.summoner', 2)]
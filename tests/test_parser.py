@@ -0,0 +1,22 @@
+from annie import ParserPool
+from annie.parser import parse_match
+from benchmarks.fixtures import match_payload
+import json
+
+
+def test_parse_matches_keeps_order_and_bounds_the_window():
+    consumed = []
+
+    def payloads():
+        for n in range(1, 7):
+            consumed.append(n)
+            yield json.dumps(match_payload(n)), None
+
+    with ParserPool(processes=1, chunksize=1, window=2) as pool:
+        rows = pool.parse_matches(payloads())
+        first = next(rows)
+        assert len(consumed) == 2
+        result = [first, *rows]
+
+    assert [n['matches'][0][1] for n in result] == [1, 2, 3, 4, 5, 6]
+    assert result[0] == parse_match(json.dumps(match_payload(1)))
@@ -0,0 +1,68 @@
+from annie import Database, Region, TimelineStore, IngestPipeline
+from annie.dto import MatchInfoDto
+from annie.partition import copy_text
+from benchmarks.suite import Fixtures
+from datetime import datetime
+from sqlalchemy import inspect, select
+import pytest
+
+
+def test_lazy_timelines_are_read_from_partitions():
+    fixtures = Fixtures()
+    database = Database('sqlite://')
+    database.create_schema()
+    store = TimelineStore(database, partition='month')
+    IngestPipeline(fixtures.api(), database, fetch_timeline=True, timeline_store=store).ingest(Region.EUW, ['EUW1_3'])
+
+    assert len(store.partitions()) == 2
+    assert database.timeline(3)['events']
+
+    api = fixtures.api()
+    match = api.get_match(Region.EUW, 'EUW1_3', lazy_timeline=True, database=database)
+    expected = fixtures.api().get_match(Region.EUW, 'EUW1_3', fetch_timeline=True)
+    assert match.timeline_events == expected.timeline_events
+    assert match.timeline_participants == expected.timeline_participants
+    assert api._transport.requests == 1
+
+
+def test_reading_a_missing_partition_creates_no_table():
+    fixtures = Fixtures()
+    database = Database('sqlite://')
+    database.create_schema()
+    store = TimelineStore(database, partition='month')
+    IngestPipeline(fixtures.api(), database, timeline_store=store).ingest(Region.EUW, ['EUW1_3'])
+    tables = set(inspect(database.engine).get_table_names())
+
+    assert store.read(3) == {'participants': [], 'events': []}
+    assert store.read(4) is None
+    assert set(inspect(database.engine).get_table_names()) == tables
+    assert store.partitions() == []
+
+
+def test_partitions_are_written_before_the_matches(monkeypatch):
+    fixtures = Fixtures()
+    database = Database('sqlite://')
+    database.create_schema()
+    store = TimelineStore(database, partition='month')
+    pipeline = IngestPipeline(fixtures.api(), database, fetch_timeline=True, timeline_store=store)
+
+    def append(table, rows):
+        raise RuntimeError('disk full')
+    with monkeypatch.context() as patch:
+        patch.setattr(store, '_append', append)
+        with pytest.raises(RuntimeError):
+            pipeline.ingest(Region.EUW, ['EUW1_3'])
+    # no match row points at a timeline that was never stored
+    assert database.session.execute(select(MatchInfoDto.game_id)).first() is None
+
+    assert pipeline.ingest(Region.EUW, ['EUW1_3']).committed == 1
+    assert database.timeline(3)['events']
+
+
+def test_copy_text_keeps_empty_strings_apart_from_null():
+    assert copy_text(None) == '\\N'
+    assert copy_text('') == ''
+    assert copy_text('\\N') == '\\\\N'
+    assert copy_text('a\tb\nc') == 'a\\tb\\nc'
+    assert [copy_text(n) for n in (True, False, 3, 1.5)] == ['t', 'f', '3', '1.5']
+    assert copy_text(datetime(2022, 1, 2, 3, 4, 5)) == '2022-01-02 03:04:05'
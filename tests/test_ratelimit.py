@@ -0,0 +1,85 @@
+from annie import LeagueApi, Region, ApiException
+from annie.ratelimit import RateLimitBucket, RateLimiter
+from annie.static import SummonerV4
+from .conftest import ScriptedTransport, response, error
+import pytest
+
+
+def test_bucket_is_a_sliding_window():
+    bucket = RateLimitBucket(2, 10)
+    bucket.consume(0)
+    bucket.consume(1)
+    assert bucket.wait_time(2) == 8
+    assert bucket.wait_time(10) == 0
+    assert bucket.headroom(10) == 0.5
+    assert bucket.headroom(11) == 1.0
+
+
+def test_parse_header():
+    assert RateLimiter.parse_header('20:1,100:120') == [(20, 1.0), (100, 120.0)]
+    assert RateLimiter.parse_header(None) == []
+
+
+def test_acquire_waits_for_the_limit_from_headers(clock):
+    limiter = RateLimiter(margin=0)
+    headers = {'X-App-Rate-Limit': '2:10', 'X-App-Rate-Limit-Count': '1:10'}
+    assert limiter.acquire(Region.EUW, 'MatchV5.match') == 0
+    limiter.update(Region.EUW, 'MatchV5.match', headers, 200)
+
+    assert limiter.acquire(Region.EUW, 'MatchV5.match') == 0
+    assert limiter.acquire(Region.EUW, 'MatchV5.match') == 10
+    assert clock.slept == [10]
+
+
+def test_counts_from_headers_are_synced(clock):
+    limiter = RateLimiter(margin=0)
+    limiter.update(Region.EUW, 'MatchV5.match', {'X-Method-Rate-Limit': '5:10', 'X-Method-Rate-Limit-Count': '5:10'}, 200)
+    assert limiter.headroom(Region.EUW, 'MatchV5.match') == 0
+    assert limiter.acquire(Region.EUW, 'MatchV5.match') == 10
+
+
+def test_429_blocks_the_scope_for_retry_after(clock):
+    limiter = RateLimiter(margin=0)
+    headers = {'Retry-After': '7', 'X-Rate-Limit-Type': 'method'}
+    assert limiter.update(Region.EUW, 'MatchV5.match', headers, 429) == 7
+
+    assert limiter.acquire(Region.EUW, 'MatchV5.timeline') == 0
+    assert limiter.acquire(Region.EUW, 'MatchV5.match') == 7
+
+
+def test_429_without_retry_after_uses_the_default(clock):
+    limiter = RateLimiter(margin=0, default_retry_after=2)
+    assert limiter.update(Region.EUW, 'MatchV5.match', {'X-Rate-Limit-Type': 'application'}, 429) == 2
+    assert limiter.acquire(Region.EUW, 'SummonerV4.by_puuid') == 2
+
+
+def test_query_retries_after_429(clock):
+    transport = ScriptedTransport([
+        error(429, 'rate limit exceeded', {'Retry-After': '3', 'X-Rate-Limit-Type': 'application'}),
+        response(200, {'puuid': 'a'}),
+    ])
+    api = LeagueApi('key', transport=transport, rate_limiter=RateLimiter(margin=0))
+
+    assert api.query(Region.EUW, SummonerV4.by_puuid('a')) == {'puuid': 'a'}
+    assert len(transport.requests) == 2
+    assert clock.slept == [3]
+
+
+def test_query_gives_up_after_retries(clock):
+    transport = ScriptedTransport([error(429, 'rate limit exceeded', {'Retry-After': '1'}) for _ in range(3)])
+    api = LeagueApi('key', transport=transport, rate_limiter=RateLimiter(margin=0), retries=2)
+
+    with pytest.raises(ApiException) as e:
+        api.query(Region.EUW, SummonerV4.by_puuid('a'))
+    assert e.value.status_code == 429
+    assert len(transport.requests) == 3
+
+
+def test_other_errors_are_not_retried(clock):
+    transport = ScriptedTransport([error(404, 'not found')])
+    api = LeagueApi('key', transport=transport, rate_limiter=RateLimiter(margin=0))
+
+    with pytest.raises(ApiException) as e:
+        api.query(Region.EUW, SummonerV4.by_puuid('a'))
+    assert e.value.status_code == 404
+    assert len(transport.requests) == 1
@@ -0,0 +1,62 @@
+from annie import Database, Region
+from annie.dto import MatchInfoDto, MatchParticipantDto, MatchEventDto
+from annie.record import Record, record_type, dto_type, to_mapped
+from benchmarks.suite import Fixtures
+from dataclasses import fields
+from sqlalchemy import select, func
+import pytest
+
+
+@pytest.fixture(scope='module')
+def fixtures() -> Fixtures:
+    return Fixtures()
+
+
+def test_record_type_mirrors_the_dto():
+    record = record_type(MatchInfoDto)
+    assert record is record_type(MatchInfoDto)
+    assert record.__name__ == 'MatchInfoRecord'
+    assert issubclass(record, Record) and record.__dto__ is MatchInfoDto
+    assert [n.name for n in fields(record)] == [n.name for n in fields(MatchInfoDto)]
+    assert record.relationships() == MatchInfoDto.relationships()
+    assert not hasattr(record(**{n.name: None for n in fields(record)}), '__dict__')
+
+    assert dto_type(MatchInfoDto) is MatchInfoDto
+    assert dto_type(MatchInfoDto, records=True) is record
+
+
+def test_to_mapped_round_trips(fixtures):
+    record = fixtures.api(records=True).get_match(Region.EUW, 'EUW1_1', fetch_timeline=True)
+    dto = fixtures.api().get_match(Region.EUW, 'EUW1_1', fetch_timeline=True)
+    assert isinstance(record, Record)
+
+    mapped = to_mapped(record)
+    assert type(mapped) is MatchInfoDto
+    assert type(mapped.participants[0]) is MatchParticipantDto
+    assert type(mapped.timeline_events[0]) is MatchEventDto
+    assert Database.rows_of(mapped) == Database.rows_of(record) == Database.rows_of(dto)
+    assert [type(n) for n in to_mapped([record, record.participants[0]])] == [MatchInfoDto, MatchParticipantDto]
+
+
+def test_records_are_upserted(fixtures):
+    api = fixtures.api(records=True)
+    database = Database('sqlite://')
+    database.create_schema()
+
+    database.upsert([api.get_match(Region.EUW, f'EUW1_{n}', fetch_timeline=True) for n in (1, 2)])
+    database.upsert(api.get_match(Region.EUW, 'EUW1_1', fetch_timeline=True))
+
+    def count(dto) -> int:
+        return database.session.execute(select(func.count()).select_from(dto)).scalar()
+
+    assert count(MatchInfoDto) == 2
+    assert count(MatchParticipantDto) == 20
+    assert count(MatchEventDto) == 2 * len(fixtures.api(records=True).get_timeline(Region.EUW, 'EUW1_1')['events'])
+
+
+def test_records_cannot_defer_the_timeline(fixtures):
+    api = fixtures.api(records=True)
+    with pytest.raises(ValueError):
+        api.get_match(Region.EUW, 'EUW1_1', lazy_timeline=True)
+    with pytest.raises(ValueError):
+        api.get_match(Region.EUW, 'EUW1_1', prefetch_timeline=True)
@@ -0,0 +1,85 @@
+from annie import LeagueApi, Database, Region, SummonerResolver
+from annie.dto import SummonerDto
+from benchmarks.transport import StubTransport
+from datetime import datetime
+from sqlalchemy import select
+import json
+import requests
+
+
+class PlayerTransport(StubTransport):
+    # answers every puuid with its own summoner, except for the few made to fail
+    def __init__(self):
+        super().__init__([(r'/lol/summoner/v4/summoners/by-puuid/(.+)', self.summoner)])
+        self.puuids = []
+
+    @staticmethod
+    def summoner(match) -> bytes:
+        puuid = match[1]
+        return json.dumps({'id': f'id-{puuid}', 'accountId': 'account', 'puuid': puuid, 'name': puuid,
+                           'profileIconId': 1, 'revisionDate': 1650000000000, 'summonerLevel': 30}).encode()
+
+    def get(self, region, uri, headers, stream=False):
+        puuid = uri.split('?', 1)[0].rsplit('/', 1)[-1]
+        self.puuids.append(puuid)
+        if puuid == 'offline':
+            raise requests.ConnectionError('connection reset')
+        if puuid == 'broken':
+            return self.response(b'{"status": {"message": "boom", "status_code": 500}}', 500, uri)
+        if puuid == 'unknown':
+            return self.response(b'{"status": {"message": "Data not found", "status_code": 404}}', 404, uri)
+        return super().get(region, uri, headers, stream)
+
+
+def resolver(database: Database=None) -> SummonerResolver:
+    # method caches are off, so repeated puuids only collapse in the resolver
+    api = LeagueApi('key', transport=PlayerTransport(), method_caches={'get_summoner': None}, retries=0)
+    return SummonerResolver(api, database, workers=4)
+
+
+def stored(puuid: str) -> SummonerDto:
+    return SummonerDto(region='EUW', summoner_id=f'id-{puuid}', profile_icon_id=1, revision_date=datetime(2022, 1, 1),
+                       summoner_name='stored', account_id='account', puuid=puuid, summoner_level=1)
+
+
+def test_the_database_answers_first():
+    database = Database('sqlite://')
+    database.create_schema()
+    database.upsert(stored('a'))
+    summoners = resolver(database)
+
+    result = summoners.summoners(Region.EUW, puuids=['a', 'b'])
+    assert result['a'].summoner_name == 'stored'
+    assert result['b'].summoner_name == 'b'
+    assert summoners._api._transport.puuids == ['b']
+    assert database.session.get(SummonerDto, ('EUW', 'id-b')).puuid == 'b'
+
+    assert summoners.summoners(Region.EUW, puuids=['a'], refresh=True)['a'].summoner_name == 'a'
+
+
+def test_repeated_keys_are_requested_once():
+    summoners = resolver()
+    result = summoners.summoners(Region.EUW, puuids=['a', 'b', 'a', 'b', 'a'])
+    assert sorted(result) == ['a', 'b']
+    assert sorted(summoners._api._transport.puuids) == ['a', 'b']
+
+
+def test_unknown_keys_are_left_out():
+    summoners = resolver()
+    assert sorted(summoners.summoners(Region.EUW, puuids=['a', 'unknown'])) == ['a']
+    assert summoners.errors == {}
+
+
+def test_failures_are_reported_and_the_rest_is_stored():
+    database = Database('sqlite://')
+    database.create_schema()
+    summoners = resolver(database)
+
+    result = summoners.summoners(Region.EUW, puuids=['a', 'broken', 'offline', 'b'])
+    assert sorted(result) == ['a', 'b']
+    assert summoners.errors['broken'].startswith('500')
+    assert summoners.errors['offline'].startswith('request failed')
+    assert sorted(database.session.execute(select(SummonerDto.puuid)).scalars()) == ['a', 'b']
+
+    summoners.summoners(Region.EUW, puuids=['c'])
+    assert summoners.errors == {}
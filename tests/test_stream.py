@@ -0,0 +1,30 @@
+from annie.stream import iter_array_items
+import json
+import pytest
+
+
+BODY = json.dumps({
+    'metadata': {'note': 'frames', 'participants': ['a']},
+    'frames': [123, {'b': 'é[]", "frames": ['}, 's,t', -4.5e3, True, None, [1, [2]], 0],
+    'frame_interval': 60000,
+}, ensure_ascii=False).encode()
+
+
+def chunked(body: bytes, size: int):
+    return [body[n:n+size] for n in range(0, len(body), size)]
+
+
+def test_items_survive_every_chunk_boundary():
+    expected = json.loads(BODY)['frames']
+    for size in range(1, len(BODY) + 1):
+        assert list(iter_array_items(chunked(BODY, size), 'frames', compact_at=8)) == expected, size
+
+
+def test_missing_array():
+    with pytest.raises(ValueError):
+        list(iter_array_items([b'{"info": []}'], 'frames'))
+
+
+def test_truncated_array():
+    with pytest.raises(ValueError):
+        list(iter_array_items(chunked(b'{"frames": [1, 2', 3), 'frames'))
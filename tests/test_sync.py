@@ -0,0 +1,23 @@
+from annie import LeagueApi, Database, Region, Queue, MatchHistorySync
+from benchmarks.fixtures import match_payload
+from benchmarks.transport import StubTransport
+import json
+
+
+def test_watermarks_are_kept_per_queue():
+    transport = StubTransport([
+        (r'/lol/match/v5/matches/by-puuid/.+/ids', json.dumps(['EUW1_2', 'EUW1_1']).encode()),
+        (r'/lol/match/v5/matches/EUW1_1', json.dumps(match_payload(1)).encode()),
+        (r'/lol/match/v5/matches/EUW1_2', json.dumps(match_payload(2)).encode()),
+    ])
+    database = Database('sqlite://')
+    database.create_schema()
+    sync = MatchHistorySync(LeagueApi('key', transport=transport), database)
+
+    sync.sync(Region.EUW, ['player'], queue=Queue.SOLO)
+    assert sync.watermark(Region.EUW, 'player', Queue.SOLO).last_match_id == 'EUW1_2'
+    assert sync.watermark(Region.EUW, 'player') is None
+
+    sync.sync(Region.EUW, ['player'])
+    assert sync.watermark(Region.EUW, 'player').last_match_id == 'EUW1_2'
+    assert sync.new_match_ids(Region.EUW, 'player', Queue.FLEX) == ['EUW1_2', 'EUW1_1']